@@ -0,0 +1,218 @@
+import functools
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from bitmap_index import BitmapIndex
+from skills_index import SkillsIndex
+
+
+# versión del dataset: hash del contenido del CSV (cambia solo si cambian los datos)
+def dataset_version(path, chunk_size=1 << 20):
+    return dataset_digest(path, chunk_size)[0].hexdigest()[:16]
+
+
+# hash en curso y bytes leídos: la ingesta incremental sigue hasheando desde ahí
+def dataset_digest(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, 'rb') as fh:
+        for block in iter(lambda: fh.read(chunk_size), b''):
+            digest.update(block)
+            size += len(block)
+    return digest, size
+
+
+# -------------------------
+# Agregados por endpoint
+# -------------------------
+def top_skills(df: pd.DataFrame, skills: SkillsIndex):
+    counts = skills.counts()
+    order = np.argsort(-counts, kind='stable')[:10]
+    return [(skills.names[i], int(counts[i])) for i in order if counts[i] > 0]
+
+
+def avg_salary_by_level(df: pd.DataFrame, skills: SkillsIndex):
+    valid = df.dropna(subset=['salary'])
+    # el salario puede venir en float32: acumular en float64
+    return valid['salary'].astype(np.float64).groupby(valid['seniority_level'], observed=True).mean().to_dict()
+
+
+def most_wanted_jobs(df: pd.DataFrame, skills: SkillsIndex):
+    return df['job_title'].value_counts().head(10).to_dict()
+
+
+def top_companies(df: pd.DataFrame, skills: SkillsIndex):
+    return df['company'].value_counts().head(10).to_dict()
+
+
+def avg_salary_by_technology(df: pd.DataFrame, skills: SkillsIndex):
+    means = skills.salary_means(df['salary'])
+    order = [i for i in np.argsort(-means, kind='stable') if not np.isnan(means[i])][:10]
+    return {skills.names[i]: float(means[i]) for i in order}
+
+
+def jobs_by_location(df: pd.DataFrame, skills: SkillsIndex):
+    return df['location'].dropna().value_counts().head(10).to_dict()
+
+
+AGGREGATES = {
+    'top_skills': top_skills,
+    'avg_salary_by_level': avg_salary_by_level,
+    'most_wanted_jobs': most_wanted_jobs,
+    'top_companies': top_companies,
+    'avg_salary_by_technology': avg_salary_by_technology,
+    'jobs_by_location': jobs_by_location,
+}
+
+
+def compute_aggregates(df: pd.DataFrame, skills: SkillsIndex):
+    return {name: aggregate(df, skills) for name, aggregate in AGGREGATES.items()}
+
+
+# resumen de un subconjunto de ofertas (resultado de /query)
+def summarize_rows(index: BitmapIndex, skills: SkillsIndex, rows, n=10):
+    counts = skills.counts(rows)
+    order = np.argsort(-counts, kind='stable')[:n]
+    salary = index.salary[rows]
+    salary = salary[~np.isnan(salary)]
+    return {
+        'count': int(len(rows)),
+        'avg_salary': float(salary.mean()) if len(salary) else None,
+        'top_skills': [(skills.names[i], int(counts[i])) for i in order if counts[i] > 0],
+        'top_job_titles': index.value_counts('job_title', rows, n),
+        'top_companies': index.value_counts('company', rows, n),
+        'avg_salary_by_level': {
+            level: float(mean) for level, mean in index.group_means('seniority_level', rows).items()
+        },
+    }
+
+
+# -------------------------
+# Rankings paginables (n, offset, order, min_count)
+# -------------------------
+class Ranking:
+    """
+    Claves con su valor (conteo o salario promedio) y soporte (cantidad de
+    ofertas detrás del valor). Orden total: valor (desc o asc) y, en los
+    empates, clave ascendente; así las páginas no repiten ni saltean claves
+    empatadas en el corte, y la respuesta por defecto (`default`, las
+    primeras `default_n`) coincide con ?n=10.
+
+    >>> ranking = Ranking(names, counts, counts, integer=True)
+    >>> ranking.page(n=10, offset=20, order='desc', min_count=5)
+    """
+    def __init__(self, keys, values, support, pairs=False, integer=False, default_n=10):
+        self.keys = np.asarray(keys, dtype=object)
+        self.values = np.asarray(values, dtype=np.float64)
+        self.support = np.asarray(support)
+        # top_skills responde una lista de pares; el resto, un dict
+        self.pairs = pairs
+        self.integer = integer
+        # None: la respuesta por defecto lleva todas las claves (avg_salary_by_level)
+        self.default_n = default_n
+        # posición de cada clave en orden alfabético, para desempatar
+        self.key_rank = np.empty(len(self.keys), dtype=np.int64)
+        self.key_rank[np.argsort(self.keys.astype(str), kind='stable')] = np.arange(len(self.keys))
+        self.candidates = functools.lru_cache(maxsize=64)(self._candidates)
+
+    def _candidates(self, min_count, order):
+        # claves con soporte suficiente y su puntaje (menor = primero)
+        candidates = np.flatnonzero((self.support >= max(min_count, 1)) & ~np.isnan(self.values))
+        scores = self.values[candidates]
+        return candidates, (scores if order == 'asc' else -scores)
+
+    def page(self, n=10, offset=0, order='desc', min_count=1):
+        candidates, scores = self.candidates(min_count, 'asc' if order == 'asc' else 'desc')
+        end = len(candidates) if n is None else min(offset + n, len(candidates))
+        selected = np.arange(len(candidates))
+        if 0 < end < len(candidates):
+            # selección parcial: las `end` primeras más las empatadas con la última, y solo ellas se ordenan
+            kth = scores[np.argpartition(scores, end - 1)[end - 1]]
+            selected = np.flatnonzero(scores <= kth)
+        ordered = selected[np.lexsort((self.key_rank[candidates[selected]], scores[selected]))]
+        cast = int if self.integer else float
+        items = [(self.keys[i], cast(self.values[i])) for i in candidates[ordered[offset:end]]]
+        return items if self.pairs else dict(items)
+
+    def default(self):
+        return self.page(n=self.default_n)
+
+
+def compute_rankings(skills: SkillsIndex, index: BitmapIndex):
+    salary_sums, salary_counts = skills.salary_sums(index.salary)
+    skill_counts = skills.counts()
+    level_sums, level_counts = index.group_sums('seniority_level')
+    with np.errstate(invalid='ignore', divide='ignore'):
+        skill_means = salary_sums / salary_counts
+        level_means = level_sums / level_counts
+
+    def counts(column):
+        column_index = index.columns[column]
+        return Ranking(column_index.values, column_index.counts, column_index.counts, integer=True)
+
+    return {
+        'top_skills': Ranking(skills.names, skill_counts, skill_counts, pairs=True, integer=True),
+        'avg_salary_by_level': Ranking(index.columns['seniority_level'].values, level_means, level_counts,
+                                       default_n=None),
+        'most_wanted_jobs': counts('job_title'),
+        'top_companies': counts('company'),
+        'avg_salary_by_technology': Ranking(skills.names, skill_means, salary_counts),
+        'jobs_by_location': counts('location'),
+    }
+
+
+def json_key(name: str) -> bytes:
+    return ('"' + name + '"').encode('utf-8')
+
+
+class MaterializedAggregates:
+    """
+    Resultados de todos los endpoints calculados una sola vez por versión
+    del dataset y guardados ya serializados (bytes JSON).
+
+    >>> aggregates = MaterializedAggregates.build(df, skills, version, app.json.dumps)
+    >>> aggregates.payloads['top_skills']
+    """
+    def __init__(self, version: str, payloads: dict, rankings: dict = None, dumps=None):
+        self.version = version
+        self.payloads = payloads
+        self.rankings = rankings or {}
+        self.dumps = dumps
+        # cada combinación de parámetros se calcula una vez por versión
+        self.page = functools.lru_cache(maxsize=4096)(self._page)
+        self.dashboard = functools.lru_cache(maxsize=256)(self._dashboard)
+
+    @classmethod
+    def build(cls, df: pd.DataFrame, skills: SkillsIndex, version: str, dumps, index: BitmapIndex = None):
+        rankings = compute_rankings(skills, index) if index is not None else None
+        return cls.from_results(compute_aggregates(df, skills), version, dumps, rankings)
+
+    @classmethod
+    def from_results(cls, results: dict, version: str, dumps, rankings: dict = None):
+        # las respuestas por defecto salen del mismo ranking que las paginadas: mismo desempate
+        results = {**results, **{name: ranking.default() for name, ranking in (rankings or {}).items()}}
+        payloads = {
+            name: (dumps(result, separators=(',', ':')) + '\n').encode('utf-8')
+            for name, result in results.items()
+        }
+        return cls(version, payloads, rankings, dumps)
+
+    def _page(self, name, n, offset, order, min_count):
+        result = self.rankings[name].page(n, offset, order, min_count)
+        # sin ordenar claves: el orden del ranking es parte de la respuesta
+        return (self.dumps(result, separators=(',', ':'), sort_keys=False) + '\n').encode('utf-8')
+
+    def _dashboard(self, sections: tuple, params=None):
+        # un solo JSON armado con los bytes ya serializados de cada sección
+        parts = [
+            json_key(name) + b':' + (self.payloads[name] if params is None else self.page(name, *params)).rstrip(b'\n')
+            for name in sorted(sections)
+        ]
+        return b'{' + b','.join(parts) + b'}\n'
+
+    def etag(self, name: str, params=None) -> str:
+        if params is None:
+            return f'{self.version}-{name}'
+        return f'{self.version}-{name}-' + '-'.join(str(p) for p in params)
@@ -0,0 +1,97 @@
+import argparse
+import ast
+import os
+
+import numpy as np
+import pandas as pd
+
+
+SOURCE_PATH = os.path.join(os.path.dirname(__file__), '..', 'datasets', 'data_science_job_posts_2025.csv')
+CHUNK_ROWS = 500_000
+
+
+def _skill_variants(source: pd.DataFrame, rng, n_variants=5000):
+    # variants of the real skill lists: one skill dropped or one added from the marginal distribution
+    lists = [ast.literal_eval(s) for s in source['skills'].dropna()]
+    marginal = pd.Series([skill for skills in lists for skill in skills]).value_counts(normalize=True)
+    variants = []
+    for _ in range(n_variants):
+        skills = list(lists[rng.integers(len(lists))])
+        if skills and rng.random() < 0.5:
+            skills.pop(rng.integers(len(skills)))
+        else:
+            extra = rng.choice(marginal.index, p=marginal.to_numpy())
+            if extra not in skills:
+                skills.insert(rng.integers(len(skills) + 1), extra)
+        variants.append(str(skills))
+    return np.array(variants, dtype=object)
+
+
+def _format_euros(values):
+    return pd.Series(np.round(values).astype(np.int64)).map('€{:,}'.format)
+
+
+def _jitter_salary(salary: pd.Series, rng):
+    # keep the range / single-value shape of each string, move the amounts by up to ±10%
+    parts = salary.str.extract(r'€([\d,]+)(?: - €([\d,]+))?')
+    low = pd.to_numeric(parts[0].str.replace(',', ''), errors='coerce').to_numpy(np.float64)
+    high = pd.to_numeric(parts[1].str.replace(',', ''), errors='coerce').to_numpy(np.float64)
+    factor = rng.uniform(0.9, 1.1, len(salary))
+    low_text = _format_euros(np.nan_to_num(low * factor))
+    high_text = _format_euros(np.nan_to_num(high * factor))
+    out = np.where(np.isnan(high), low_text, low_text + ' - ' + high_text)
+    return pd.Series(np.where(np.isnan(low), salary.to_numpy(object), out), index=salary.index)
+
+
+def generate_chunk(source: pd.DataFrame, n_rows, rng, n_companies, skill_variants):
+    """
+    Bootstrap whole rows from the source (so seniority, salary, location and
+    the misaligned ownership/company_size/revenue cells keep their joint
+    distribution), then spread companies over a larger Zipf-distributed pool,
+    jitter salaries and swap some skill lists for close variants.
+    """
+    rows = source.iloc[rng.integers(len(source), size=n_rows)].reset_index(drop=True)
+
+    new_company = rng.random(n_rows) < 0.5
+    ranks = np.minimum(rng.zipf(1.2, size=n_rows), n_companies)
+    rows.loc[new_company, 'company'] = pd.Series(ranks[new_company]).map('company_{:07d}'.format).to_numpy()
+
+    rows['salary'] = _jitter_salary(rows['salary'], rng)
+
+    variant = rng.random(n_rows) < 0.3
+    rows.loc[variant, 'skills'] = skill_variants[rng.integers(len(skill_variants), size=int(variant.sum()))]
+    return rows
+
+
+def generate(n_rows, path, seed=0, source_path=SOURCE_PATH, chunk_rows=CHUNK_ROWS):
+    """
+    Write a synthetic CSV with `n_rows` postings statistically similar to the
+    bundled dataset, in bounded chunks.
+
+    >>> generate(1_000_000, '/tmp/postings_1m.csv')
+    """
+    rng = np.random.default_rng(seed)
+    source = pd.read_csv(source_path)
+    skill_variants = _skill_variants(source, rng)
+    # the company catalogue grows with the dataset, like a real scrape
+    n_companies = max(source['company'].nunique(), n_rows // 20)
+    written = 0
+    while written < n_rows:
+        size = min(chunk_rows, n_rows - written)
+        chunk = generate_chunk(source, size, rng, n_companies, skill_variants)
+        chunk.to_csv(path, mode='w' if written == 0 else 'a', header=written == 0, index=False)
+        written += size
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic job postings CSV.')
+    parser.add_argument('rows', type=int, help='number of postings, e.g. 10000, 1000000, 10000000')
+    parser.add_argument('output', help='CSV path to write')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    generate(args.rows, args.output, seed=args.seed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,250 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from benchmarks.generate import generate  # noqa: E402
+
+BUNDLED = os.path.join(ROOT, 'datasets', 'data_science_job_posts_2025.csv')
+ROUTES = ('/top_skills', '/avg_salary_by_level', '/most_wanted_jobs', '/top_companies',
+          '/avg_salary_by_technology', '/jobs_by_location', '/dashboard', '/debug/memory',
+          '/query?seniority_level=senior&ownership=Public',
+          '/query?seniority_level=senior&industry=Retail&min_salary=100000',
+          '/skill_cooccurrence?skill=python', '/salary_percentiles?by=skill',
+          '/cube?group_by=location,seniority_level',
+          '/trends?granularity=week', '/trends/movers', '/trends/hiring_velocity')
+QUERIES = {
+    'senior_public': ({'seniority_level': ['senior'], 'ownership': ['Public']}, None, None),
+    'senior_retail_100k': ({'seniority_level': ['senior'], 'industry': ['Retail']}, 100000, None),
+    'salary_range': ({}, 80000, 120000),
+}
+# ignore differences below this many seconds when checking for regressions
+MIN_SECONDS = 0.001
+
+
+def measure(fn, repeats=3):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'seconds': statistics.median(times), 'peak_bytes': peak}
+
+
+def measure_stages(make, stages):
+    # stages mutate shared state, so each pass runs the whole sequence once
+    cases = {}
+    timed = make()
+    for name in stages:
+        start = time.perf_counter()
+        getattr(timed, name)()
+        cases[name] = {'seconds': time.perf_counter() - start}
+    traced = make()
+    for name in stages:
+        tracemalloc.start()
+        getattr(traced, name)()
+        cases[name]['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return cases
+
+
+def measure_dataset(path):
+    # runs in a fresh process, see run_size
+    cases = {}
+    start = time.perf_counter()
+    import job_analyzer
+    cases['startup.import'] = {'seconds': time.perf_counter() - start}
+
+    from aggregates import AGGREGATES, summarize_rows
+    from bitmap_index import BitmapIndex
+    from datasets.cube import CUBE_COLUMNS
+    from datasets.feature_engineering import FeatureEngineer
+    from datasets.salary_parser import parse_salary
+    from datasets.schema import compact_frame
+    from skills_index import SkillsIndex
+
+    raw = pd.read_csv(path)
+    cases['load.read_csv'] = measure(lambda: pd.read_csv(path), repeats=1)
+    cases['load.parse_salary'] = measure(lambda: parse_salary(raw['salary']))
+    cases['load.compact_frame'] = measure(lambda: compact_frame(raw), repeats=1)
+
+    state = job_analyzer.dataset
+    df = state.df
+    # the served frame no longer keeps the skills text column (see load_dataset)
+    cases['index.skills'] = measure(lambda: SkillsIndex.from_series(raw['skills']), repeats=1)
+    cases['index.bitmaps'] = measure(lambda: BitmapIndex.from_frame(df), repeats=1)
+    skills, bitmaps = state.skills, state.bitmaps
+    for name, aggregate in AGGREGATES.items():
+        cases[f'aggregate.{name}'] = measure(lambda: aggregate(df, skills))
+    for name, (filters, low, high) in QUERIES.items():
+        cases[f'query.{name}'] = measure(lambda: summarize_rows(bitmaps, skills, bitmaps.select(filters, low, high)))
+
+    client = job_analyzer.app.test_client()
+    for route in ROUTES:
+        cases[f'route.{route}'] = measure(lambda: client.get(route), repeats=5)
+        etag = client.get(route).headers.get('ETag')
+        if etag:
+            cases[f'route.{route}.304'] = measure(lambda: client.get(route, headers={'If-None-Match': etag}), repeats=5)
+
+    stages = ('engineer_post_date', 'engineer_company_info', 'engineer_location', 'engineer_salary')
+    for name, case in measure_stages(lambda: FeatureEngineer(raw), stages).items():
+        cases[f'feature.{name}'] = case
+    cases['feature.engineer_all'] = measure(lambda: FeatureEngineer(raw).engineer_all(), repeats=1)
+    # lazy mode: only the stages behind the requested columns run
+    cases['feature.select_cube'] = measure(lambda: FeatureEngineer(raw, copy=False).select(CUBE_COLUMNS), repeats=1)
+
+    return {
+        'rows': len(raw),
+        # ru_maxrss is in KiB on Linux
+        'peak_rss_bytes': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        'cases': cases,
+    }
+
+
+def measure_workers(workers):
+    # runs in a fresh process, like gunicorn's master with preload_app: load once, fork
+    # `workers` children that serve every route, then read each child's unique memory
+    import gc
+    import job_analyzer
+    from metrics import process_memory
+    job_analyzer.warm_up()
+
+    def fork_and_measure():
+        children = []
+        for _ in range(workers):
+            ready_r, ready_w = os.pipe()
+            done_r, done_w = os.pipe()
+            pid = os.fork()
+            if pid == 0:
+                client = job_analyzer.app.test_client()
+                for _ in range(3):
+                    for route in ROUTES:
+                        client.get(route)
+                gc.collect()
+                os.write(ready_w, b'1')
+                os.read(done_r, 1)
+                os._exit(0)
+            children.append((pid, ready_r, done_w))
+        for _, ready_r, _ in children:
+            os.read(ready_r, 1)
+        memory = [process_memory(pid) for pid, _, _ in children]
+        for pid, _, done_w in children:
+            os.write(done_w, b'1')
+            os.waitpid(pid, 0)
+        return {
+            'uss_bytes': [m.get('uss') for m in memory],
+            'pss_bytes': [m.get('pss') for m in memory],
+        }
+
+    # without and with gc.freeze() before forking (gunicorn.conf.py freezes)
+    result = {'workers': workers, 'master': process_memory(), 'unfrozen': fork_and_measure()}
+    gc.freeze()
+    result['frozen'] = fork_and_measure()
+    return result
+
+
+def _child(path, cache_dir, *args, **env):
+    env = dict(os.environ, JOB_ANALYZER_DATA=path, JOB_ANALYZER_CACHE_DIR=cache_dir, **env)
+    out = subprocess.run([sys.executable, '-m', 'benchmarks.run', *args], cwd=ROOT, env=env,
+                         check=True, capture_output=True, text=True)
+    return json.loads(out.stdout)
+
+
+def run_size(path, workdir, workers=0):
+    cache_dir = tempfile.mkdtemp(dir=workdir, prefix='cache-')
+    # first child builds the columnar cache (cold start), second one reads it
+    cold = _child(path, cache_dir, '--startup', path)
+    result = _child(path, cache_dir, '--measure', path)
+    result['cases']['startup.import.cold'] = cold
+    if workers:
+        # serving mode of gunicorn.conf.py
+        result['workers'] = _child(path, cache_dir, '--fork', str(workers), JOB_ANALYZER_PRELOAD='1')
+    return result
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for size, result in results['sizes'].items():
+        old_cases = baseline.get('sizes', {}).get(size, {}).get('cases', {})
+        for case, new in result['cases'].items():
+            old = old_cases.get(case)
+            if old is None:
+                continue
+            slower = new['seconds'] - old['seconds']
+            if slower > MIN_SECONDS and new['seconds'] > old['seconds'] * (1 + threshold):
+                regressions.append({'size': size, 'case': case, 'baseline': old['seconds'],
+                                    'seconds': new['seconds'], 'ratio': new['seconds'] / old['seconds']})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time and memory-profile job_analyzer and FeatureEngineer.')
+    parser.add_argument('rows', nargs='*', type=int,
+                        help='synthetic dataset sizes, e.g. 10000 1000000 10000000 (default: bundled CSV)')
+    parser.add_argument('--output', help='write the JSON results here (default: stdout)')
+    parser.add_argument('--baseline', help='previous JSON results to check for regressions')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='allowed slowdown ratio against the baseline (default: 0.25)')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='also fork this many preloaded workers and report their unique memory (Linux)')
+    parser.add_argument('--measure', help=argparse.SUPPRESS)
+    parser.add_argument('--fork', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--startup', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.startup:
+        start = time.perf_counter()
+        import job_analyzer  # noqa: F401
+        print(json.dumps({'seconds': time.perf_counter() - start}))
+        return
+    if args.measure:
+        print(json.dumps(measure_dataset(args.measure)))
+        return
+    if args.fork:
+        print(json.dumps(measure_workers(args.fork)))
+        return
+
+    results = {'python': platform.python_version(), 'pandas': pd.__version__, 'sizes': {}}
+    with tempfile.TemporaryDirectory() as workdir:
+        if not args.rows:
+            results['sizes']['bundled'] = run_size(BUNDLED, workdir, args.workers)
+        for rows in args.rows:
+            path = generate(rows, os.path.join(workdir, f'postings_{rows}.csv'))
+            results['sizes'][str(rows)] = run_size(path, workdir, args.workers)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as fh:
+            results['regressions'] = compare(results, json.load(fh), args.threshold)
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            fh.write(text)
+    else:
+        print(text)
+
+    if results.get('regressions'):
+        for item in results['regressions']:
+            print(f"regression [{item['size']}] {item['case']}: {item['baseline']:.4f}s -> "
+                  f"{item['seconds']:.4f}s (x{item['ratio']:.2f})", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
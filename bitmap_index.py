@@ -0,0 +1,215 @@
+import numpy as np
+import pandas as pd
+
+from datasets._vectorize import map_unique
+
+
+FILTER_COLUMNS = ('job_title', 'seniority_level', 'status', 'company', 'location', 'industry', 'ownership')
+
+
+# -------------------------
+# Utilidades de bitmaps (palabras de 64 bits, bit i = fila i)
+# -------------------------
+def ids_to_bitmap(ids, n_rows):
+    mask = np.zeros(((n_rows + 63) // 64) * 64, dtype=bool)
+    mask[ids] = True
+    return np.packbits(mask, bitorder='little').view(np.uint64)
+
+
+def bitmap_to_ids(words, n_rows):
+    bits = np.unpackbits(words.view(np.uint8), bitorder='little')[:n_rows]
+    return np.flatnonzero(bits)
+
+
+def bitmap_contains(words, ids):
+    ids = np.asarray(ids, dtype=np.int64)
+    return ((words[ids >> 6] >> (ids & 63).astype(np.uint64)) & np.uint64(1)).astype(bool)
+
+
+def sorted_contains(sorted_ids, ids):
+    if len(sorted_ids) == 0:
+        return np.zeros(len(ids), dtype=bool)
+    pos = np.searchsorted(sorted_ids, ids)
+    return sorted_ids[np.minimum(pos, len(sorted_ids) - 1)] == ids
+
+
+class ColumnIndex:
+    """
+    Índice invertido de una columna categórica: para cada valor, la lista
+    ordenada de filas que lo contienen. Los valores frecuentes (más de
+    n_rows / 32 filas, donde el bitmap ocupa menos que la lista) tienen
+    además un bitmap precalculado.
+    """
+    def __init__(self, series: pd.Series):
+        codes, values = pd.factorize(series, use_na_sentinel=True)
+        # las filas con faltantes (-1) quedan al principio y se saltean
+        codes = codes.astype(np.int32)
+        self._build(codes, np.asarray(values, dtype=object), np.argsort(codes, kind='stable').astype(np.int32))
+
+    def _build(self, codes, values, order):
+        self.n_rows = len(codes)
+        self.codes = codes
+        self.values = values
+        self.lookup = {value: code for code, value in enumerate(self.values)}
+        self.order = order
+        counts = np.bincount(self.codes[self.codes >= 0], minlength=len(self.values))
+        self.offsets = np.concatenate(([0], np.cumsum(counts))) + np.count_nonzero(self.codes < 0)
+        self.counts = counts
+        self.dense = {
+            code: ids_to_bitmap(self.row_ids(code), self.n_rows)
+            for code in np.flatnonzero(counts * 32 > self.n_rows)
+        }
+
+    def append(self, series: pd.Series) -> 'ColumnIndex':
+        # índice con las filas nuevas al final (ids n_rows...), sin reordenar las existentes:
+        # cada grupo del orden viejo se copia a su nueva posición y las filas nuevas van detrás
+        lookup = dict(self.lookup)
+        # los valores nuevos toman los códigos siguientes; los faltantes, -1
+        new_codes = map_unique(
+            series, lambda uniques: np.array([lookup.setdefault(v, len(lookup)) for v in uniques], dtype=np.int32), -1
+        )
+        values = np.array(list(lookup), dtype=object)
+
+        # grupo 0 = faltantes, grupo c + 1 = valor c
+        groups = len(values) + 1
+        old_counts = np.bincount(self.codes + 1, minlength=groups)
+        new_counts = np.bincount(new_codes + 1, minlength=groups)
+        old_start = np.concatenate(([0], np.cumsum(old_counts)))[:-1]
+        new_start = np.concatenate(([0], np.cumsum(new_counts)))[:-1]
+        start = np.concatenate(([0], np.cumsum(old_counts + new_counts)))[:-1]
+
+        order = np.empty(self.n_rows + len(new_codes), dtype=np.int32)
+        old_group = self.codes[self.order] + 1
+        order[np.arange(self.n_rows) - old_start[old_group] + start[old_group]] = self.order
+        new_order = np.argsort(new_codes, kind='stable')
+        new_group = new_codes[new_order] + 1
+        rank = np.arange(len(new_codes)) - new_start[new_group]
+        order[start[new_group] + old_counts[new_group] + rank] = new_order + self.n_rows
+
+        index = ColumnIndex.__new__(ColumnIndex)
+        index._build(np.concatenate((self.codes, new_codes)), values, order)
+        return index
+
+    @property
+    def nbytes(self):
+        return (self.codes.nbytes + self.order.nbytes + self.offsets.nbytes
+                + sum(words.nbytes for words in self.dense.values()))
+
+    def row_ids(self, code):
+        return self.order[self.offsets[code]:self.offsets[code + 1]]
+
+    def select(self, values):
+        # unión de los valores pedidos -> ('bitmap', palabras) o ('ids', filas ordenadas);
+        # un valor repetido (?company=X&company=X) cuenta una sola vez
+        codes = sorted({self.lookup[v] for v in values if v in self.lookup})
+        total = int(self.counts[codes].sum()) if codes else 0
+        if total * 32 <= self.n_rows:
+            ids = np.concatenate([self.row_ids(c) for c in codes]) if codes else np.empty(0, dtype=np.int32)
+            return 'ids', np.sort(ids) if len(codes) > 1 else ids
+        words = np.zeros((self.n_rows + 63) // 64, dtype=np.uint64)
+        sparse_ids = []
+        for code in codes:
+            if code in self.dense:
+                words |= self.dense[code]
+            else:
+                sparse_ids.append(self.row_ids(code))
+        if sparse_ids:
+            words |= ids_to_bitmap(np.concatenate(sparse_ids), self.n_rows)
+        return 'bitmap', words
+
+
+class BitmapIndex:
+    """
+    Índices por columna para responder filtros intersectando listas de
+    filas / bitmaps en lugar de recorrer todo el DataFrame.
+
+    >>> index = BitmapIndex.from_frame(df)
+    >>> rows = index.select({'seniority_level': ['senior'], 'ownership': ['Public']},
+    ...                     min_salary=100000)
+    """
+    def __init__(self, n_rows, columns: dict, salary: np.ndarray, salary_order: np.ndarray = None):
+        self.n_rows = n_rows
+        self.columns = columns
+        self.salary = salary
+        # orden por salario para los filtros de rango sin filtros categóricos
+        if salary_order is None:
+            valid = np.flatnonzero(~np.isnan(salary))
+            salary_order = valid[np.argsort(salary[valid], kind='stable')]
+        self.salary_order = salary_order
+        self.salary_sorted = salary[self.salary_order]
+
+    @property
+    def nbytes(self):
+        return (self.salary.nbytes + self.salary_order.nbytes + self.salary_sorted.nbytes
+                + sum(index.nbytes for index in self.columns.values()))
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, columns=FILTER_COLUMNS):
+        salary = np.asarray(df['salary'], dtype=np.float64)
+        return cls(len(df), {col: ColumnIndex(df[col]) for col in columns}, salary)
+
+    def append(self, df: pd.DataFrame) -> 'BitmapIndex':
+        # índice con las filas de `df` al final; el orden por salario se mezcla en lugar de reordenarse
+        new_salary = np.asarray(df['salary'], dtype=np.float64)
+        valid = np.flatnonzero(~np.isnan(new_salary))
+        new_order = valid[np.argsort(new_salary[valid], kind='stable')]
+        positions = np.searchsorted(self.salary_sorted, new_salary[new_order], side='right')
+        salary_order = np.insert(self.salary_order, positions, new_order + self.n_rows)
+        columns = {col: index.append(df[col]) for col, index in self.columns.items()}
+        return BitmapIndex(self.n_rows + len(df), columns, np.concatenate((self.salary, new_salary)), salary_order)
+
+    def select(self, filters: dict, min_salary=None, max_salary=None) -> np.ndarray:
+        operands = [self.columns[col].select(values) for col, values in filters.items() if values]
+        id_lists = sorted((ids for kind, ids in operands if kind == 'ids'), key=len)
+        bitmaps = [words for kind, words in operands if kind == 'bitmap']
+
+        if id_lists:
+            # partir de la lista más chica y filtrar por pertenencia al resto
+            rows = id_lists[0]
+            for other in id_lists[1:]:
+                rows = rows[sorted_contains(other, rows)]
+            for words in bitmaps:
+                rows = rows[bitmap_contains(words, rows)]
+        elif bitmaps:
+            words = bitmaps[0].copy()
+            for other in bitmaps[1:]:
+                words &= other
+            rows = bitmap_to_ids(words, self.n_rows)
+        elif min_salary is not None or max_salary is not None:
+            lo = 0 if min_salary is None else np.searchsorted(self.salary_sorted, min_salary, side='left')
+            hi = len(self.salary_sorted) if max_salary is None else np.searchsorted(self.salary_sorted, max_salary, side='right')
+            return np.sort(self.salary_order[lo:hi])
+        else:
+            return np.arange(self.n_rows)
+
+        if min_salary is not None or max_salary is not None:
+            salary = self.salary[rows]
+            keep = ~np.isnan(salary)
+            if min_salary is not None:
+                keep &= salary >= min_salary
+            if max_salary is not None:
+                keep &= salary <= max_salary
+            rows = rows[keep]
+        return rows
+
+    def value_counts(self, column, rows, n=10):
+        index = self.columns[column]
+        codes = index.codes[rows]
+        counts = np.bincount(codes[codes >= 0], minlength=len(index.values))
+        order = np.argsort(-counts, kind='stable')[:n]
+        return {index.values[i]: int(counts[i]) for i in order if counts[i] > 0}
+
+    def group_sums(self, column, rows=None):
+        # (suma de salarios, cantidad de salarios) por valor de la columna
+        index = self.columns[column]
+        codes = index.codes if rows is None else index.codes[rows]
+        salary = self.salary if rows is None else self.salary[rows]
+        keep = (codes >= 0) & ~np.isnan(salary)
+        sums = np.bincount(codes[keep], weights=salary[keep], minlength=len(index.values))
+        counts = np.bincount(codes[keep], minlength=len(index.values))
+        return sums, counts
+
+    def group_means(self, column, rows=None):
+        index = self.columns[column]
+        sums, counts = self.group_sums(column, rows)
+        return {index.values[i]: sums[i] / counts[i] for i in np.flatnonzero(counts)}
@@ -0,0 +1,121 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from datasets._vectorize import decode
+
+
+CACHE_DIR = os.environ.get('JOB_ANALYZER_CACHE_DIR', '.cache')
+# subir este número cuando cambie la limpieza, para invalidar caches viejos
+CACHE_FORMAT = 6
+
+
+# caché columnar del dataset ya limpio:
+#   - columnas numéricas -> <col>.npy (se cargan con mmap, páginas compartidas entre workers)
+#   - columnas de texto y categóricas -> <col>.codes.npy + <col>.values.json (diccionario)
+def _cache_prefix(csv_path):
+    # <nombre>-<hash de la ruta completa>: dos CSV con el mismo nombre en carpetas distintas
+    # (un snapshot y el dataset principal) no comparten caché
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    path_hash = hashlib.sha256(os.path.abspath(csv_path).encode('utf-8')).hexdigest()[:8]
+    return f'{stem}-{path_hash}'
+
+
+def cache_path(csv_path, version, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, f'{_cache_prefix(csv_path)}-{version}-v{CACHE_FORMAT}')
+
+
+def write_frame(df: pd.DataFrame, path):
+    parent = os.path.dirname(path) or '.'
+    os.makedirs(parent, exist_ok=True)
+    tmp = tempfile.mkdtemp(dir=parent, prefix='.building-')
+    manifest = []
+    # bytes de cada columna antes de compactarla (ver compact_frame), para /debug/memory
+    source_bytes = df.attrs.get('source_bytes', {})
+    for i, col in enumerate(df.columns):
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes, values = series.cat.codes.to_numpy(), series.cat.categories
+            kind = 'category'
+        elif pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            np.save(os.path.join(tmp, f'{i}.npy'), series.to_numpy())
+            manifest.append({'name': col, 'kind': 'numeric', 'source_bytes': source_bytes.get(col)})
+            continue
+        else:
+            codes, values = pd.factorize(series.astype(object), use_na_sentinel=True)
+            codes = codes.astype(np.int32)
+            kind = 'dictionary'
+        np.save(os.path.join(tmp, f'{i}.codes.npy'), codes)
+        with open(os.path.join(tmp, f'{i}.values.json'), 'w', encoding='utf-8') as fh:
+            json.dump([str(v) for v in values], fh, ensure_ascii=False)
+        manifest.append({'name': col, 'kind': kind, 'source_bytes': source_bytes.get(col)})
+    with open(os.path.join(tmp, 'manifest.json'), 'w', encoding='utf-8') as fh:
+        json.dump(manifest, fh)
+    try:
+        os.rename(tmp, path)
+    except OSError:
+        # otro worker lo construyó primero
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def read_frame(path, mmap=True, categorical=False) -> pd.DataFrame:
+    with open(os.path.join(path, 'manifest.json'), encoding='utf-8') as fh:
+        manifest = json.load(fh)
+    mmap_mode = 'r' if mmap else None
+    columns = {}
+    for i, entry in enumerate(manifest):
+        if entry['kind'] == 'numeric':
+            columns[entry['name']] = np.load(os.path.join(path, f'{i}.npy'), mmap_mode=mmap_mode)
+        else:
+            codes = np.load(os.path.join(path, f'{i}.codes.npy'), mmap_mode=mmap_mode)
+            with open(os.path.join(path, f'{i}.values.json'), encoding='utf-8') as fh:
+                values = json.load(fh)
+            # categorical=True: también las columnas de texto quedan como códigos + tabla de strings,
+            # sin un puntero (y un refcount) por fila
+            if entry['kind'] == 'category' or categorical:
+                columns[entry['name']] = pd.Categorical.from_codes(codes, categories=values)
+            else:
+                # el código -1 (faltante) queda en None
+                columns[entry['name']] = decode(codes, np.array(values, dtype=object))
+    df = pd.DataFrame(columns, copy=False)
+    df.attrs['source_bytes'] = {
+        entry['name']: entry['source_bytes'] for entry in manifest if entry.get('source_bytes') is not None
+    }
+    return df
+
+
+def _remove_stale(csv_path, keep, cache_dir):
+    # solo versiones viejas de este mismo CSV (<nombre>-<hash de ruta>-<versión>-v<formato>):
+    # 2024.csv no toca la caché de 2024-eu.csv
+    pattern = re.compile(re.escape(_cache_prefix(csv_path)) + r'-[0-9a-f]{16}-v\d+')
+    if not os.path.isdir(cache_dir):
+        return
+    for name in os.listdir(cache_dir):
+        full = os.path.join(cache_dir, name)
+        if pattern.fullmatch(name) and full != keep:
+            shutil.rmtree(full, ignore_errors=True)
+
+
+def load_cached_frame(csv_path, version, build, cache_dir=CACHE_DIR, mmap=True, categorical=False) -> pd.DataFrame:
+    """
+    Devuelve el dataset limpio desde la caché columnar; si no existe para
+    esta versión del CSV, lo construye con `build(csv_path)` y lo guarda.
+
+    >>> df = load_cached_frame(DATA_PATH, dataset_version(DATA_PATH), load_data)
+    """
+    path = cache_path(csv_path, version, cache_dir)
+    if not os.path.exists(os.path.join(path, 'manifest.json')):
+        df = build(csv_path)
+        try:
+            write_frame(df, path)
+            _remove_stale(csv_path, path, cache_dir)
+        except OSError:
+            # sin permisos de escritura: trabajar sin caché
+            return df
+    return read_frame(path, mmap=mmap, categorical=categorical)
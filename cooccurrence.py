@@ -0,0 +1,125 @@
+import functools
+
+import numpy as np
+from scipy import sparse
+
+from skills_index import SkillsIndex
+
+
+COOCCURRENCE_SORTS = ('count', 'lift', 'salary_premium')
+
+
+class SkillCooccurrence:
+    """
+    Co-ocurrencia de habilidades a partir de la matriz de Gram dispersa
+    X.T @ X (X = oferta x habilidad): la celda (a, b) es la cantidad de
+    ofertas que piden ambas. Las sumas de salario por par salen del mismo
+    producto ponderado, así que nunca se arma la matriz densa skill x skill.
+
+    >>> cooccurrence = SkillCooccurrence.from_index(skills, df['salary'])
+    >>> cooccurrence.query('spark', n=10, sort='lift')
+    """
+    def __init__(self, names, gram, salary_gram, valid_gram, n_rows, salary_sum, salary_count):
+        self.names = names
+        self.ids = {name: i for i, name in enumerate(names)}
+        self.gram = gram
+        self.salary_gram = salary_gram
+        self.valid_gram = valid_gram
+        self.counts = gram.diagonal()
+        self.n_rows = n_rows
+        self.salary_sum = salary_sum
+        self.salary_count = salary_count
+        self.avg_salary = salary_sum / salary_count if salary_count else None
+        # pares (a < b) del triángulo superior, para el top global
+        upper = sparse.triu(gram, k=1).tocoo()
+        self.pair_rows = upper.row
+        self.pair_cols = upper.col
+        self.pair_counts = upper.data
+        self.query = functools.lru_cache(maxsize=1024)(self._query)
+
+    @staticmethod
+    def _grams(matrix: sparse.csr_matrix, salary):
+        salary = np.asarray(salary, dtype=np.float64)
+        valid = ~np.isnan(salary)
+        x = matrix.astype(np.int64)
+        x_t = x.T.tocsr()
+        # filas de X escaladas por el salario (0 si falta) / por "tiene salario"
+        gram = (x_t @ x).tocsr()
+        salary_gram = (x_t @ x.multiply(np.where(valid, salary, 0.0)[:, None]).tocsr()).tocsr()
+        valid_gram = (x_t @ x.multiply(valid.astype(np.int64)[:, None]).tocsr()).tocsr()
+        return gram, salary_gram, valid_gram, float(salary[valid].sum()), int(valid.sum())
+
+    @classmethod
+    def from_index(cls, skills: SkillsIndex, salary):
+        gram, salary_gram, valid_gram, salary_sum, salary_count = cls._grams(skills.matrix, salary)
+        return cls(skills.names, gram, salary_gram, valid_gram, skills.n_rows, salary_sum, salary_count)
+
+    def append(self, skills: SkillsIndex, salary) -> 'SkillCooccurrence':
+        # X.T @ X es una suma sobre ofertas: se suma el Gram de las filas nuevas
+        # (`skills` ya incluye las existentes; `salary` es solo el de las nuevas)
+        gram, salary_gram, valid_gram, salary_sum, salary_count = self._grams(skills.matrix[self.n_rows:], salary)
+        size = len(skills.names)
+
+        def grow(matrix):
+            matrix = matrix.tocoo()
+            return sparse.csr_matrix((matrix.data, (matrix.row, matrix.col)), shape=(size, size))
+
+        return SkillCooccurrence(
+            skills.names,
+            (grow(self.gram) + grow(gram)).tocsr(),
+            (grow(self.salary_gram) + grow(salary_gram)).tocsr(),
+            (grow(self.valid_gram) + grow(valid_gram)).tocsr(),
+            skills.n_rows, self.salary_sum + salary_sum, self.salary_count + salary_count,
+        )
+
+    @property
+    def nbytes(self):
+        return sum(m.data.nbytes + m.indices.nbytes + m.indptr.nbytes
+                   for m in (self.gram, self.salary_gram, self.valid_gram))
+
+    def _pairs(self, skill=None):
+        if skill is None:
+            return self.pair_rows, self.pair_cols, self.pair_counts
+        i = self.ids[skill]
+        start, end = self.gram.indptr[i], self.gram.indptr[i + 1]
+        cols, counts = self.gram.indices[start:end], self.gram.data[start:end]
+        keep = cols != i
+        return np.full(keep.sum(), i), cols[keep], counts[keep]
+
+    def _query(self, skill=None, n=10, sort='count', min_count=1):
+        rows, cols, counts = self._pairs(skill)
+        keep = counts >= max(min_count, 1)
+        rows, cols, counts = rows[keep], cols[keep], counts[keep]
+
+        # se leen del Gram ponderado solo las celdas de los pares que quedaron
+        salary_sums = np.asarray(self.salary_gram[rows, cols]).ravel()
+        salary_counts = np.asarray(self.valid_gram[rows, cols]).ravel()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            lift = counts * self.n_rows / (self.counts[rows].astype(np.float64) * self.counts[cols])
+            avg_salary = np.where(salary_counts > 0, salary_sums / np.maximum(salary_counts, 1), np.nan)
+        premium = avg_salary - (self.avg_salary if self.avg_salary is not None else np.nan)
+
+        scores = {'count': counts.astype(np.float64), 'lift': lift, 'salary_premium': premium}[sort]
+        scores = np.where(np.isnan(scores), -np.inf, -scores)
+        k = min(n, len(scores))
+        selected = np.argpartition(scores, k - 1)[:k] if 0 < k < len(scores) else np.arange(k)
+        selected = selected[np.lexsort((selected, scores[selected]))]
+
+        def number(value):
+            return None if np.isnan(value) else float(value)
+
+        return {
+            'skill': skill,
+            'n_postings': int(self.n_rows),
+            'avg_salary': self.avg_salary,
+            'pairs': [
+                {
+                    'skills': [self.names[rows[p]], self.names[cols[p]]],
+                    'count': int(counts[p]),
+                    'lift': number(lift[p]),
+                    'avg_salary': number(avg_salary[p]),
+                    'salary_premium': number(premium[p]),
+                }
+                for p in selected
+            ],
+        }
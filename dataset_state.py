@@ -0,0 +1,106 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+from aggregates import MaterializedAggregates
+from bitmap_index import BitmapIndex
+from cooccurrence import SkillCooccurrence
+from datasets.cube import CUBE_COLUMNS, MISSING, OLAPCube
+from datasets.feature_engineering import FeatureEngineer
+from datasets.schema import append_frame, compact_frame
+from metrics import observe_feature_stages
+from skills_index import SkillsIndex
+from streaming import PartialAggregates
+from trends import TrendIndex
+
+
+logger = logging.getLogger(__name__)
+
+
+class DatasetState:
+    """
+    Todo lo que se sirve para una versión del dataset: frame, índices,
+    agregados, sketches y cubo. No se modifica: una ingesta arma un estado
+    nuevo a partir de este (solo con las filas nuevas) y la app reemplaza la
+    referencia de una vez, así cada request ve una única versión completa.
+
+    En modo streaming `df`, `skills`, `bitmaps`, `cooccurrence` y `trends` son None.
+
+    >>> state = state.append(new_rows, version, clean_frame, app.json.dumps)
+    """
+    def __init__(self, version, rows, aggregates: MaterializedAggregates, partial: PartialAggregates,
+                 cube: OLAPCube, df: pd.DataFrame = None, skills: SkillsIndex = None,
+                 bitmaps: BitmapIndex = None, cooccurrence: SkillCooccurrence = None, trends: TrendIndex = None):
+        self.version = version
+        self.rows = rows
+        self.aggregates = aggregates
+        # agregados sumables (contadores, sumas de salario, sketches) a los que se suman los deltas
+        self.partial = partial
+        self.cube = cube
+        self.df = df
+        self.skills = skills
+        self.bitmaps = bitmaps
+        self.cooccurrence = cooccurrence
+        self.trends = trends
+
+    @property
+    def salary_sketches(self):
+        return self.partial.salary_sketches
+
+    @property
+    def heavy_hitters(self):
+        return self.partial.heavy_hitters
+
+    def memory(self, dumps) -> dict:
+        # bytes de cada índice / agregado derivado (el frame se reporta por columna en /debug/memory)
+        return {
+            'skills': self.skills.nbytes if self.skills is not None else 0,
+            'bitmaps': self.bitmaps.nbytes if self.bitmaps is not None else 0,
+            'aggregates': sum(len(payload) for payload in self.aggregates.payloads.values()),
+            'cooccurrence': self.cooccurrence.nbytes if self.cooccurrence is not None else 0,
+            'trends': self.trends.nbytes if self.trends is not None else 0,
+            'salary_sketches': self.salary_sketches.nbytes,
+            'cube': self.cube.nbytes,
+            'heavy_hitters': len(dumps(self.heavy_hitters.to_dict())),
+        }
+
+    def nbytes(self, dumps) -> int:
+        # total para el presupuesto de memoria de los snapshots: frame + índices
+        frame = int(self.df.memory_usage(deep=True).sum()) if self.df is not None else 0
+        return frame + sum(self.memory(dumps).values())
+
+    def append(self, raw: pd.DataFrame, version, clean, dumps) -> 'DatasetState':
+        # `raw`: filas nuevas tal como vienen en el CSV; solo ellas se limpian y se indexan
+        cleaned = compact_frame(clean(raw.copy()), source_bytes=raw.memory_usage(deep=True, index=False).to_dict())
+        delta_skills = SkillsIndex.from_series(cleaned['skills'])
+        partial = self.partial.copy().merge(
+            PartialAggregates(self.partial.salary_column, self.partial.exact, self.heavy_hitters.epsilon)
+            .update(cleaned, delta_skills)
+        )
+        aggregates = MaterializedAggregates.from_results(partial.results(), version, dumps, partial.rankings())
+        # etiquetas de ownership conocidas + las del lote: las mismas que vería una carga completa
+        ownerships = np.union1d(
+            [value for value in self.cube.values['ownership'] if value != MISSING],
+            raw['ownership'].dropna().unique().astype(str),
+        )
+        engineer = FeatureEngineer(raw, ownerships=ownerships, copy=False, strict=False)
+        features = engineer.select(CUBE_COLUMNS)
+        observe_feature_stages(engineer.metrics)
+        unresolved = len(engineer.parse_errors['location']) + len(engineer.parse_errors['headquarter'])
+        if unresolved:
+            logger.warning('%d ubicaciones sin continente quedaron como faltantes en el cubo', unresolved)
+        cube = self.cube.merge(OLAPCube.from_frame(features))
+        if self.df is None:
+            return DatasetState(version, self.rows + len(raw), aggregates, partial, cube)
+
+        skills = self.skills.append(delta_skills)
+        bitmaps = self.bitmaps.append(cleaned)
+        return DatasetState(
+            version, self.rows + len(raw), aggregates, partial, cube,
+            df=append_frame(self.df, cleaned),
+            skills=skills,
+            bitmaps=bitmaps,
+            cooccurrence=self.cooccurrence.append(skills, cleaned['salary']),
+            trends=self.trends.append(cleaned['post_date'], cleaned['salary'], skills, bitmaps),
+        )
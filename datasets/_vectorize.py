@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+
+
+def decode(codes, table, missing=None):
+    """
+    Look up `codes` in `table`; code -1 (missing) gives `missing`.
+
+    >>> decode(np.array([1, -1, 0]), np.array(['a', 'b'], dtype=object))
+    array(['b', None, 'a'], dtype=object)
+    """
+    table = table if isinstance(table, np.ndarray) else np.array(table, dtype=object)
+    # code -1 picks the trailing entry
+    padded = np.empty(len(table) + 1, dtype=table.dtype)
+    padded[:-1] = table
+    padded[-1] = missing
+    return padded[codes]
+
+
+def map_unique(values: pd.Series, fn, missing=np.nan):
+    """
+    Run `fn` once over the distinct non-missing values of `values` (as an
+    object Series) and broadcast its result back to every row; missing rows
+    get `missing`. `fn` returns one array aligned with the distinct values,
+    or a tuple of them, and then `missing` is a tuple with one fill each.
+
+    >>> low, high = map_unique(df['salary'], parse_bounds, (np.nan, np.nan))
+    """
+    codes, uniques = pd.factorize(values.astype(object), use_na_sentinel=True)
+    result = fn(pd.Series(uniques, dtype=object))
+    if isinstance(result, tuple):
+        return tuple(decode(codes, table, fill) for table, fill in zip(result, missing))
+    return decode(codes, result, missing)
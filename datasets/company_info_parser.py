@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+
+try:
+    from ._vectorize import map_unique
+except ImportError:
+    from _vectorize import map_unique
+
+
+# "€354.99B", "€913.33M", "€1.45T" or a plain "€1,200"
+AMOUNT_PATTERN = r'^\s*€\s*(?P<number>\d[\d,]*(?:\.\d+)?)\s*(?P<suffix>[MBT]?)\s*$'
+# "155,030"
+HEADCOUNT_PATTERN = r'^\s*\d[\d,]*\s*$'
+# as exponents, so '33.8B' parses as the decimal 33.8e9 (not 33.8 * 1e9)
+SUFFIXES = {'': '', 'M': 'e6', 'B': 'e9', 'T': 'e12'}
+
+# cell kinds
+MISSING, LABEL, AMOUNT, HEADCOUNT, INVALID = range(5)
+
+
+def classify_cells(values: pd.Series, labels):
+    """
+    Classify every cell of `values` as MISSING, LABEL (one of `labels`),
+    AMOUNT (€ with optional M/B/T suffix), HEADCOUNT (integer with thousands
+    separators) or INVALID, parsing each distinct string once.
+
+    Returns the kinds (int8), the parsed numbers (NaN unless AMOUNT or
+    HEADCOUNT) and whether the cell mentions €.
+
+    >>> kinds, numbers, euro = classify_cells(df['company_size'], ['Public', 'Private'])
+    """
+    def classify(text: pd.Series):
+        text = text.astype(str)
+        amount = text.str.extract(AMOUNT_PATTERN)
+        amounts = pd.to_numeric(
+            amount['number'].str.replace(',', '', regex=False) + amount['suffix'].map(SUFFIXES), errors='coerce'
+        ).to_numpy(np.float64)
+        headcounts = pd.to_numeric(
+            text.where(text.str.match(HEADCOUNT_PATTERN)).str.replace(',', '', regex=False), errors='coerce'
+        ).to_numpy(np.float64)
+        kind = np.select(
+            [text.isin(labels).to_numpy(), ~np.isnan(amounts), ~np.isnan(headcounts)],
+            [LABEL, AMOUNT, HEADCOUNT], INVALID,
+        ).astype(np.int8)
+        number = np.where(kind == AMOUNT, amounts, np.where(kind == HEADCOUNT, headcounts, np.nan))
+        return kind, number, text.str.contains('€', regex=False).to_numpy()
+
+    # each distinct string is classified once and broadcast back to its rows
+    return map_unique(values, classify, (MISSING, np.nan, False))
+
+
+def parse_company_info(ownership: pd.Series, company_size: pd.Series, revenue: pd.Series, labels):
+    """
+    Reconcile the misaligned ownership / company_size / revenue columns in
+    one pass: ownership labels found in company_size or revenue move to
+    ownership, € amounts in company_size move to revenue, and revenue and
+    company_size become numbers (€ and headcount).
+
+    Returns the reconciled frame and two frames of boolean masks: `repaired`
+    (ownership / revenue taken from another column) and `rejected`
+    (company_size / revenue cells that are present but hold nothing usable,
+    left as NaN instead of raising).
+
+    >>> info, repaired, rejected = parse_company_info(df['ownership'], df['company_size'],
+    ...                                               df['revenue'], ['Public', 'Private'])
+    """
+    size_kind, size_number, size_euro = classify_cells(company_size, labels)
+    revenue_kind, revenue_number, revenue_euro = classify_cells(revenue, labels)
+
+    # a label in company_size wins over one in revenue
+    from_size = size_kind == LABEL
+    from_revenue = (revenue_kind == LABEL) & ~from_size
+    owner = ownership.to_numpy(object, copy=True)
+    owner[from_size] = company_size.to_numpy(object)[from_size]
+    owner[from_revenue] = revenue.to_numpy(object)[from_revenue]
+
+    # any € cell in company_size is the revenue; otherwise revenue keeps only its own € amounts
+    source_kind = np.where(size_euro, size_kind, np.where(revenue_euro, revenue_kind, MISSING))
+    source_number = np.where(size_euro, size_number, revenue_number)
+    parsed_revenue = np.where(source_kind == AMOUNT, source_number, np.nan)
+    headcount = np.where(size_kind == HEADCOUNT, size_number, np.nan)
+
+    index = ownership.index
+    info = pd.DataFrame({'ownership': owner, 'company_size': headcount, 'revenue': parsed_revenue}, index=index)
+    repaired = pd.DataFrame({
+        'ownership': (from_size | from_revenue) & (owner != ownership.to_numpy(object)),
+        'revenue': size_euro & (size_kind == AMOUNT),
+    }, index=index)
+    rejected = pd.DataFrame({
+        'company_size': (size_kind == INVALID) & ~size_euro,
+        'revenue': ((source_kind == INVALID)
+                    | (~size_euro & np.isin(revenue_kind, (HEADCOUNT, INVALID)) & ~revenue_euro)),
+    }, index=index)
+    return info, repaired, rejected
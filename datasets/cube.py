@@ -0,0 +1,172 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+
+# clean dimensions and numeric measures of FeatureEngineer.engineer_all()
+CUBE_DIMENSIONS = ('location', 'headquarter', 'seniority_level', 'industry', 'ownership', 'status')
+CUBE_MEASURES = ('mean_salary', 'company_size', 'revenue')
+# per measure and cell: non-null count, sum, sum of squares, min, max
+CUBE_STATS = ('count', 'sum', 'sum_sq', 'min', 'max')
+MISSING = '(missing)'
+# the only engineered columns the cube needs, see FeatureEngineer.select
+CUBE_COLUMNS = CUBE_DIMENSIONS + CUBE_MEASURES
+
+
+def _base_cells(df: pd.DataFrame, dimensions, measures) -> pd.DataFrame:
+    # one row per non-empty combination of every dimension (the finest cuboid)
+    keys = [df[dim].astype(object).where(df[dim].notna(), MISSING).rename(dim) for dim in dimensions]
+    values = pd.DataFrame({'rows': np.ones(len(df), dtype=np.int64)}, index=df.index)
+    for measure in measures:
+        column = pd.to_numeric(df[measure], errors='coerce').astype(np.float64)
+        values[measure] = column
+        values[measure + '_sq'] = column ** 2
+    grouped = values.groupby(keys, sort=False)
+    cells = pd.DataFrame({'rows': grouped['rows'].sum()})
+    for measure in measures:
+        cells[f'{measure}.count'] = grouped[measure].count()
+        cells[f'{measure}.sum'] = grouped[measure].sum()
+        cells[f'{measure}.sum_sq'] = grouped[measure + '_sq'].sum()
+        cells[f'{measure}.min'] = grouped[measure].min()
+        cells[f'{measure}.max'] = grouped[measure].max()
+    return cells.reset_index()
+
+
+def _combine_base(frames, dimensions, measures) -> pd.DataFrame:
+    # re-aggregate base cells from several chunks: counts and sums add up, min/max of min/max
+    base = pd.concat(frames, ignore_index=True)
+    how = {'rows': 'sum'}
+    for measure in measures:
+        how.update({f'{measure}.count': 'sum', f'{measure}.sum': 'sum', f'{measure}.sum_sq': 'sum',
+                    f'{measure}.min': 'min', f'{measure}.max': 'max'})
+    return base.groupby(list(dimensions), sort=False).agg(how).reset_index()
+
+
+class OLAPCube:
+    """
+    Pre-aggregated cube over the engineered dimensions. Every combination
+    of dimensions (cuboid) is rolled up once from the finest one, so a
+    group-by/slice is a mask over a few hundred cells instead of a groupby
+    over the postings.
+
+    >>> cube = OLAPCube.from_frame(FeatureEngineer(df_features, copy=False).select(CUBE_COLUMNS))
+    >>> cube.query(group_by=['location', 'seniority_level'], filters={'industry': ['Retail']})
+    """
+    def __init__(self, base: pd.DataFrame, dimensions=CUBE_DIMENSIONS, measures=CUBE_MEASURES):
+        self.base = base
+        self.dimensions = tuple(dimensions)
+        self.measures = tuple(measures)
+        self.values = {}
+        self.lookup = {}
+        codes = {}
+        for dim in self.dimensions:
+            dim_codes, uniques = pd.factorize(base[dim].astype(object))
+            codes[dim] = dim_codes
+            self.values[dim] = np.asarray(uniques, dtype=object)
+            self.lookup[dim] = {value: code for code, value in enumerate(uniques)}
+        stats = {name: base[name].to_numpy(dtype=np.float64) for name in self._stat_columns()}
+        stats['rows'] = base['rows'].to_numpy(dtype=np.float64)
+
+        # every cuboid, from the finest down to the grand total, each rolled up from its smallest parent
+        self.cuboids = {frozenset(self.dimensions): (codes, stats)}
+        for size in range(len(self.dimensions) - 1, -1, -1):
+            for dims in itertools.combinations(self.dimensions, size):
+                parents = [self.cuboids[frozenset(dims + (extra,))]
+                           for extra in self.dimensions if extra not in dims]
+                parent = min(parents, key=lambda cuboid: len(cuboid[1]['rows']))
+                self.cuboids[frozenset(dims)] = self._rollup(parent, dims)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, dimensions=CUBE_DIMENSIONS, measures=CUBE_MEASURES):
+        return cls(_base_cells(df, dimensions, measures), dimensions, measures)
+
+    @classmethod
+    def from_frames(cls, frames, dimensions=CUBE_DIMENSIONS, measures=CUBE_MEASURES):
+        # build chunk by chunk (e.g. engineered CSV chunks); only the base cells are kept
+        parts = [_base_cells(df, dimensions, measures) for df in frames]
+        return cls(_combine_base(parts, dimensions, measures), dimensions, measures)
+
+    def merge(self, other: 'OLAPCube') -> 'OLAPCube':
+        return type(self)(_combine_base([self.base, other.base], self.dimensions, self.measures),
+                          self.dimensions, self.measures)
+
+    def _stat_columns(self):
+        return [f'{measure}.{stat}' for measure in self.measures for stat in CUBE_STATS]
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for codes, stats in self.cuboids.values()
+                   for array in itertools.chain(codes.values(), stats.values()))
+
+    @staticmethod
+    def _rollup(cuboid, dims):
+        codes, stats = cuboid
+        n = len(stats['rows'])
+        if dims:
+            keys, inverse = np.unique(np.column_stack([codes[dim] for dim in dims]), axis=0, return_inverse=True)
+            inverse = inverse.ravel()
+        else:
+            keys, inverse = np.zeros((min(n, 1), 0), dtype=np.int64), np.zeros(n, dtype=np.int64)
+        groups = len(keys)
+        rolled = {}
+        for name, values in stats.items():
+            if name.endswith('.min'):
+                out = np.full(groups, np.inf)
+                np.fmin.at(out, inverse, values)
+            elif name.endswith('.max'):
+                out = np.full(groups, -np.inf)
+                np.fmax.at(out, inverse, values)
+            else:
+                out = np.bincount(inverse, weights=values, minlength=groups)
+            rolled[name] = out
+        return {dim: keys[:, i] for i, dim in enumerate(dims)}, rolled
+
+    def query(self, group_by=(), filters=None, measure='mean_salary'):
+        """
+        Statistics of `measure` per combination of `group_by`, restricted to
+        the cells matching `filters` ({dimension: [values]}).
+        """
+        group_by = tuple(group_by)
+        filters = {dim: list(values) for dim, values in (filters or {}).items() if values}
+        unknown = [dim for dim in group_by + tuple(filters) if dim not in self.dimensions]
+        if unknown:
+            raise KeyError(f'Unknown dimensions: {unknown}')
+        if measure not in self.measures:
+            raise KeyError(f'Unknown measure: {measure}')
+
+        codes, stats = self.cuboids[frozenset(group_by) | frozenset(filters)]
+        mask = np.ones(len(stats['rows']), dtype=bool)
+        for dim, values in filters.items():
+            wanted = [self.lookup[dim][value] for value in values if value in self.lookup[dim]]
+            mask &= np.isin(codes[dim], wanted)
+        cuboid = {dim: dim_codes[mask] for dim, dim_codes in codes.items()}, \
+                 {name: values[mask] for name, values in stats.items()}
+        # several values of a dimension outside group_by still have to be added up
+        if any(len(values) > 1 for dim, values in filters.items() if dim not in group_by):
+            cuboid = self._rollup(cuboid, group_by)
+        codes, stats = cuboid
+
+        count = stats[f'{measure}.count']
+        # population standard deviation from the sum of squares
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = stats[f'{measure}.sum'] / count
+            std = np.sqrt(np.maximum(stats[f'{measure}.sum_sq'] / count - mean ** 2, 0))
+
+        def number(value):
+            return None if not np.isfinite(value) else float(value)
+
+        order = np.argsort(-stats['rows'], kind='stable')
+        return [
+            {
+                'key': {dim: self.values[dim][codes[dim][i]] for dim in group_by},
+                'rows': int(stats['rows'][i]),
+                'count': int(count[i]),
+                'sum': float(stats[f'{measure}.sum'][i]),
+                'mean': number(mean[i]),
+                'std': number(std[i]),
+                'min': number(stats[f'{measure}.min'][i]),
+                'max': number(stats[f'{measure}.max'][i]),
+            }
+            for i in order if stats['rows'][i] > 0
+        ]
@@ -1,102 +1,205 @@
+import functools
+import os
+import time
+from contextlib import contextmanager
+
+import numpy as np
 import pandas as pd
 
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    from ._vectorize import map_unique
+    from .gazetteer import Gazetteer
+    from .company_info_parser import parse_company_info
+    from .post_date_parser import parse_post_date
+    from .salary_parser import parse_salary
+    from .schema import compact_frame
+except ImportError:
+    from _vectorize import map_unique
+    from gazetteer import Gazetteer
+    from company_info_parser import parse_company_info
+    from post_date_parser import parse_post_date
+    from salary_parser import parse_salary
+    from schema import compact_frame
+
+
+def current_rss_bytes():
+    try:
+        with open('/proc/self/statm') as fh:
+            return int(fh.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def peak_rss_bytes():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # KiB on Linux, bytes on macOS
+    return peak if os.uname().sysname == 'Darwin' else peak * 1024
+
+
+@contextmanager
+def measure_stage(metrics: dict, name, rows_in):
+    # wall time, rows in/out and process memory of one stage; the caller sets stage['rows_out']
+    stage = {'rows_out': rows_in}
+    peak_before = peak_rss_bytes()
+    start = time.perf_counter()
+    yield stage
+    elapsed = time.perf_counter() - start
+    peak_after = peak_rss_bytes()
+    metrics[name] = {
+        'seconds': elapsed,
+        'rows_in': rows_in,
+        'rows_out': stage['rows_out'],
+        'rss_bytes': current_rss_bytes(),
+        # process high-water mark; the growth is how far this stage pushed it
+        'peak_rss_bytes': peak_after,
+        'peak_rss_growth_bytes': None if peak_after is None else peak_after - peak_before,
+    }
+
+
+def instrumented_stage(method):
+    # records each engineer_* stage in self.metrics, see measure_stage
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with measure_stage(self.metrics, method.__name__, len(self.df)) as stage:
+            result = method(self, *args, **kwargs)
+            stage['rows_out'] = len(self.df)
+        return result
+    return wrapper
+
+
 class FeatureEngineer:
     """
     >>> from feature_engineering import FeatureEngineer
     >>> fe = FeatureEngineer(df_features)
     >>> df_ready = fe.engineer_all()
+    >>> df_ready, stage_metrics = FeatureEngineer(df_features).engineer_all(return_metrics=True)
+
+    With a `reference_date` (the scrape date) the output also carries the
+    absolute `posted_on` date of each posting.
+
+    Cells that could not be parsed are listed in `parse_errors`, values moved
+    out of misaligned company columns in `repaired`, and both are counted in
+    `cell_counts`. With `strict=False` a location that maps to no continent
+    is left missing and listed there too, instead of raising.
+
+    Callers that need only some output columns can ask for them lazily:
+    only the stages writing those columns (and the ones they depend on)
+    run, each on a frame holding just the columns it reads, and their
+    results are cached for later `select` calls.
+
+    >>> fe = FeatureEngineer(df_features, copy=False)
+    >>> fe.select(['location', 'mean_salary'])
     """
-    def __init__(self, df: pd.DataFrame):
-        self.df = df.copy()
-        self.state_city_to_country = self._init_state_city_to_country()
-        self.location_to_continent = self._init_location_to_continent()
+    # stage -> (columns read, columns written), in pipeline order; a stage depends on
+    # the earlier stages that write a column it reads
+    STAGES = {
+        'engineer_post_date': (('post_date',), ('post_date', 'posted_on')),
+        'engineer_company_info': (('ownership', 'company_size', 'revenue'), ('ownership', 'company_size', 'revenue')),
+        'engineer_location': (('location', 'headquarter'), ('location', 'headquarter')),
+        'engineer_salary': (('salary',), ('min_salary', 'max_salary', 'mean_salary')),
+    }
+
+    # distinct location string -> resolved value, per (class, step); shared by every instance of a class,
+    # so a subclass with its own lookup tables never reads the base class's results
+    _location_memo = {}
+    LOCATION_MEMO_SIZE = 1_000_000
+
+    # lookup tables are built once per class and process, then shared by every instance
+    _lookups = {}
+
+    def __init__(self, df: pd.DataFrame, reference_date=None, ownerships=None, copy=True, strict=True):
+        # copy=False is meant for select(), which never writes to the input; the
+        # engineer_* methods modify self.df in place
+        self.df = df.copy() if copy else df
+        self.source = df
+        # stage -> its output columns, over the rows kept by the post_date filter (lazy mode)
+        self._stage_cache = {}
+        self._keep = None
+        self.reference_date = reference_date
+        # known ownership labels; taken from the frame itself when not given
+        self.ownerships = ownerships
+        # strict=False: a location without a continent is left missing (listed in parse_errors)
+        # instead of raising
+        self.strict = strict
+        # column -> index of the rows whose value could not be parsed (left as NaN)
+        self.parse_errors = {}
+        # column -> index of the rows whose value was moved in from a misaligned column
+        self.repaired = {}
+        # stage -> wall time, rows in/out and memory, see instrumented_stage
+        self.metrics = {}
+        if type(self) not in self._lookups:
+            state_city_to_country = self._init_state_city_to_country()
+            ambiguous = self._init_ambiguous_places()
+            location_to_continent = self._init_location_to_continent()
+            # every country the gazetteer can return needs a continent, or engineer_location raises
+            countries = set(state_city_to_country.values()).union(*ambiguous.values())
+            missing = sorted(countries - location_to_continent.keys())
+            if missing:
+                raise ValueError(f'Countries without a continent: {missing}')
+            self._lookups[type(self)] = (
+                state_city_to_country,
+                location_to_continent,
+                Gazetteer(state_city_to_country, ambiguous),
+            )
+        self.state_city_to_country, self.location_to_continent, self.gazetteer = self._lookups[type(self)]
 
     # -------------------------
     # Utilities
     # -------------------------
-    @staticmethod
-    def words_to_num(text: str) -> str:
-        transformer_dict = {
-            "zero": "0", "a ": "1 ", "one": "1", "two": "2", "three": "3", "four": "4",
-            "five": "5", "six": "6", "seven": "7", "eight": "8", "nine": "9",
-            "ten": "10", "eleven": "11", "twelve": "12",
+    @property
+    def cell_counts(self):
+        # repaired / rejected cells per column, e.g. {'rejected': {'revenue': 3, ...}, 'repaired': {...}}
+        return {
+            'repaired': {col: len(rows) for col, rows in self.repaired.items()},
+            'rejected': {col: len(rows) for col, rows in self.parse_errors.items()},
         }
-        for word, num in transformer_dict.items():
-            text = text.replace(word, num)
-        return text
-
-    @staticmethod
-    def convert_revenue_to_numeric(revenue_str):
-        if isinstance(revenue_str, str):
-            revenue_str = revenue_str.replace('€', '').replace('B', 'e9').replace('M', 'e6').replace(',', '')
-            try:
-                return float(revenue_str)
-            except ValueError:
-                return None
-        return None
 
     # -------------------------
     # Post date
     # -------------------------
-    def extract_post_date(self, el) -> int:
-        el = self.words_to_num(el)
-        number = el.split()[0]
-        if 'hour' in el.lower():
-            days = 0
-        elif 'day' in el.lower():
-            days = int(number)
-        elif 'month' in el.lower():
-            days = int(number) * 30
-        elif 'year' in el.lower():
-            days = int(number) * 365
-        else:
-            raise ValueError(f'Unexpected format in post_date: {el}')
-        return days
-
+    def _run_post_date(self, df):
+        # returns the mask of rows to keep
+        parsed, unparsed = parse_post_date(df['post_date'], self.reference_date)
+        self.parse_errors['post_date'] = df.index[unparsed]
+        df['post_date'] = parsed['days_ago']
+        if 'posted_on' in parsed:
+            df['posted_on'] = parsed['posted_on']
+        return ~unparsed & (df['post_date'] <= 360).to_numpy()
+
+    @instrumented_stage
     def engineer_post_date(self):
-        self.df['post_date'] = self.df['post_date'].apply(self.extract_post_date)
-        self.df = self.df[self.df['post_date'] <= 360]
+        self.df = self.df[self._run_post_date(self.df)]
 
     # -------------------------
     # Company size, ownership & revenue
     # -------------------------
+    def _run_company_info(self, df):
+        ownerships = self.ownerships if self.ownerships is not None else df['ownership'].dropna().unique()
+        # each cell is classified once (label, € amount, headcount) and routed to its column
+        info, repaired, rejected = parse_company_info(df['ownership'], df['company_size'], df['revenue'], ownerships)
+        df[['ownership', 'company_size', 'revenue']] = info
+        for col in repaired:
+            self.repaired[col] = df.index[repaired[col].to_numpy()]
+        for col in rejected:
+            self.parse_errors[col] = df.index[rejected[col].to_numpy()]
+
+    @instrumented_stage
     def engineer_company_info(self):
-        ownerships = self.df['ownership'].dropna().unique()
-
-        # step 1: ownership <- revenue
-        mask = self.df['revenue'].isin(ownerships)
-        self.df.loc[mask, 'ownership'] = self.df.loc[mask, 'revenue']
-
-        # step 2: ownership <- company_size
-        mask = self.df['company_size'].isin(ownerships)
-        self.df.loc[mask, 'ownership'] = self.df.loc[mask, 'company_size']
-
-        # step 3: revenue <- company_size if contains €
-        mask = self.df['company_size'].str.contains('€', na=False)
-        self.df.loc[mask, 'revenue'] = self.df.loc[mask, 'company_size']
-
-        # step 4: drop company_size if invalid
-        mask = self.df['company_size'].str.contains('€', na=False) | self.df['company_size'].isin(ownerships)
-        self.df.loc[mask, 'company_size'] = None
-
-        # step 5: keep revenue only if valid
-        mask = self.df['revenue'].astype(str).str.contains('€', na=False)
-        self.df.loc[~mask, 'revenue'] = None
-
-        # step 6: convert revenue
-        self.df['revenue'] = self.df['revenue'].apply(self.convert_revenue_to_numeric)
-
-        # step 7: clean company_size
-        self.df['company_size'] = self.df['company_size'].apply(
-            lambda x: int(''.join(x.split(','))) if isinstance(x, str) else None
-        )
+        self._run_company_info(self.df)
 
     # -------------------------
     # Location & Headquarter
     # -------------------------
     def _init_state_city_to_country(self):
         return {'AL': 'United States', 'AK': 'United States', 'AZ': 'United States', 'AR': 'United States', 'CA': 'United States',
-                'CO': 'United States', 'CT': 'United States', 'DE': 'United States', 'FL': 'United States', 'GA': 'United States',
+                'CO': 'United States', 'DE': 'United States', 'FL': 'United States', 'GA': 'United States',
                 'HI': 'United States', 'ID': 'United States', 'IL': 'United States', 'IN': 'United States', 'IA': 'United States',
                 'KS': 'United States', 'KY': 'United States', 'LA': 'United States', 'ME': 'United States', 'MD': 'United States',
                 'MA': 'United States', 'MI': 'United States', 'MN': 'United States', 'MS': 'United States', 'MO': 'United States',
@@ -114,7 +217,6 @@ class FeatureEngineer:
                 'BC': 'Canada', # British Columbia
                 'MB': 'Canada', # Manitoba
                 'SK': 'Canada', # Saskatchewan
-                'NB': 'Canada', # New Brunswick
                 'NL': 'Canada', # Newfoundland and Labrador
                 'NS': 'Canada', # Nova Scotia
                 'PE': 'Canada', # Prince Edward Island
@@ -137,10 +239,8 @@ class FeatureEngineer:
                 'Germany': 'Germany',
 
                 'LI': 'Netherlands', # Limburg
-                'NB': 'Netherlands', # North Brabant
                 'Netherlands': 'Netherlands',
 
-                'CT': 'Spain', # Catalonia
                 'Spain': 'Spain',
 
                 'UK': 'United Kingdom', 'United Kingdom': 'United Kingdom', 'GB': 'United Kingdom',
@@ -437,6 +537,12 @@ class FeatureEngineer:
                 'Zürich': 'Switzerland'
             }
 
+    def _init_ambiguous_places(self):
+        # codes shared by several regions, in priority order when nothing else in the string disambiguates;
+        # kept only here, not in _init_state_city_to_country
+        return {'CT': ['United States', 'Spain'],      # Connecticut / Catalonia
+                'NB': ['Canada', 'Netherlands']}       # New Brunswick / North Brabant
+
     def _init_location_to_continent(self):
         return {'United States': 	'United States',
                          'India': 'Asia',
@@ -464,7 +570,19 @@ class FeatureEngineer:
                          'Italy': 'Europe',
                          'Mexico': 'Other',
                          'Austria':	'Europe',
-                         'Australia': 'Other'}
+                         'Australia': 'Other',
+                         'Poland': 'Europe',
+                         'Romania': 'Europe',
+                         'Lithuania': 'Europe',
+                         'Bulgaria': 'Europe',
+                         'Portugal': 'Europe',
+                         'Norway': 'Europe',
+                         'Finland': 'Europe',
+                         'Belgium': 'Europe',
+                         'South Korea': 'Asia',
+                         'Argentina': 'Other',
+                         'New Zealand': 'Other',
+                         'South Africa': 'Other'}
 
     @staticmethod
     def extract_location(el):
@@ -490,19 +608,10 @@ class FeatureEngineer:
         if '(' in str(location):
             location = location.split('(')[0].strip()
         if not pd.isna(location):
-            found = False
-            for item in location.split():
-                if item in self.state_city_to_country.keys():
-                    found = True
-                    break
-            if location in self.state_city_to_country.keys():
-                return self.state_city_to_country[location]
-            elif 'multi-location' in location.lower():
+            if 'multi-location' in location.lower() and location not in self.state_city_to_country:
                 return 'multi-location'
-            elif found:
-                return self.state_city_to_country[item]
-            else:
-                return 'Unrecognized'
+            country = self.gazetteer.match(location)
+            return 'Unrecognized' if country is None else country
         return None
 
     def replace_location_with_continent(self, location):
@@ -513,54 +622,125 @@ class FeatureEngineer:
                 raise ValueError(f'Unrecognized location: {location}')
         return None
 
-    def engineer_location(self):
+    def resolve_location(self, location, strict=True):
+        country = self.replace_location_with_country(location)
+        if not strict and country not in self.location_to_continent:
+            return None
+        return self.replace_location_with_continent(country)
+
+    def _resolve_distinct(self, series: pd.Series, step: str, func) -> pd.Series:
+        # resolve each distinct string once (memoized across instances) and broadcast back by code
+        memo = self._location_memo.setdefault((type(self), step), {})
+        if len(memo) > self.LOCATION_MEMO_SIZE:
+            memo.clear()
+
+        def resolve(uniques):
+            resolved = np.empty(len(uniques), dtype=object)
+            for i, value in enumerate(uniques):
+                if value not in memo:
+                    memo[value] = func(value)
+                resolved[i] = memo[value]
+            return resolved
+
+        return pd.Series(map_unique(series, resolve, None), index=series.index)
+
+    def _run_location(self, df):
         # 1. Extract location
-        self.df['test'] = self.df['location'].apply(self.extract_location)
+        location = self._resolve_distinct(df['location'], 'extract_location', self.extract_location)
 
         # 2. Replace On-site / Hybrid with headquarter (your explicit step)
-        mask = self.df['test'].isin(['On-site', 'Hybrid'])
-        self.df.loc[mask, 'test'] = self.df.loc[mask, 'headquarter']
-
-        # 3. Map to country
-        self.df['test'] = self.df['test'].apply(self.replace_location_with_country)
+        mask = location.isin(['On-site', 'Hybrid'])
+        location[mask] = df.loc[mask, 'headquarter']
 
-        # 4. Map to continent
-        self.df['test'] = self.df['test'].apply(self.replace_location_with_continent)
-
-        # 5. Assign back
-        self.df['location'] = self.df['test']
+        # 3. Map to country and continent
+        step = 'continent' if self.strict else 'continent_lenient'
+        resolve = functools.partial(self.resolve_location, strict=self.strict)
+        df['location'] = self._resolve_distinct(location, step, resolve)
 
         # headquarter separately (not merged into location!)
-        self.df['test'] = self.df['headquarter'].apply(self.extract_headquarter)
-        self.df['test'] = self.df['test'].apply(self.replace_location_with_country)
-        self.df['test'] = self.df['test'].apply(self.replace_location_with_continent)
-        self.df['headquarter'] = self.df['test']
+        headquarter = self._resolve_distinct(df['headquarter'], 'extract_headquarter', self.extract_headquarter)
+        df['headquarter'] = self._resolve_distinct(headquarter, step, resolve)
+        if not self.strict:
+            self.parse_errors['location'] = df.index[(location.notna() & df['location'].isna()).to_numpy()]
+            self.parse_errors['headquarter'] = df.index[(headquarter.notna() & df['headquarter'].isna()).to_numpy()]
+
+    @instrumented_stage
+    def engineer_location(self):
+        self._run_location(self.df)
 
     # -------------------------
     # Salary
     # -------------------------
+    def _run_salary(self, df):
+        salaries, unparsed = parse_salary(df['salary'])
+        df[['min_salary', 'max_salary', 'mean_salary']] = salaries
+        self.parse_errors['salary'] = df.index[unparsed]
+
+    @instrumented_stage
     def engineer_salary(self):
-        self.df[['min_salary', 'max_salary']] = self.df['salary'].str.extract(
-            r'€([\d,\.]+) - €([\d,\.]+)'
-        )
-        single_salary_mask = self.df['salary'].str.match(r'^€[\d,\.]+$')
-        self.df.loc[single_salary_mask, 'min_salary'] = self.df.loc[single_salary_mask, 'salary'].str.extract(
-            r'€([\d,\.]+)'
-        )[0].str.replace(',', '').astype(float)
-        self.df.loc[single_salary_mask, 'max_salary'] = self.df.loc[single_salary_mask, 'min_salary']
-
-        self.df['min_salary'] = self.df['min_salary'].astype(str).str.replace(',', '').astype(float)
-        self.df['max_salary'] = self.df['max_salary'].astype(str).str.replace(',', '').astype(float)
-        self.df['mean_salary'] = (self.df['min_salary'] + self.df['max_salary']) / 2
+        self._run_salary(self.df)
 
     # -------------------------
     # Full pipeline
     # -------------------------
-    def engineer_all(self):
+    @instrumented_stage
+    def engineer_all(self, compact=False, return_metrics=False):
         self.engineer_post_date()
         self.engineer_company_info()
         self.engineer_location()
         self.engineer_salary()
-        self.df.drop(['test', 'post_date', 'salary'], axis=1, inplace=True)
+        self.df.drop(['post_date', 'salary'], axis=1, inplace=True)
+        if compact:
+            # categoricals and downcast numerics, see schema.compact_frame
+            self.df = compact_frame(self.df)
+        if return_metrics:
+            # the decorator adds the 'engineer_all' entry to this same dict on return
+            return self.df, self.metrics
         return self.df
 
+    # -------------------------
+    # Lazy, column-selective pipeline
+    # -------------------------
+    def _column(self, col, stage=None):
+        # `col` as seen by `stage` (or in the final output): written by the latest earlier
+        # stage that ran, otherwise the input column over the kept rows
+        names = list(self.STAGES)
+        earlier = names if stage is None else names[:names.index(stage)]
+        for name in reversed(earlier):
+            if name in self._stage_cache and col in self._stage_cache[name]:
+                return self._stage_cache[name][col]
+        column = self.source[col]
+        return column if self._keep is None else column[self._keep]
+
+    def _run_stage(self, stage):
+        if stage in self._stage_cache:
+            return
+        reads, writes = self.STAGES[stage]
+        names = list(self.STAGES)
+        for earlier in names[:names.index(stage)]:
+            if set(self.STAGES[earlier][1]) & set(reads):
+                self._run_stage(earlier)
+
+        # a frame with only the columns this stage reads (never the whole input)
+        frame = pd.DataFrame({col: self._column(col, stage) for col in reads})
+        run = getattr(self, '_run_' + stage[len('engineer_'):])
+        with measure_stage(self.metrics, stage, len(frame)) as measured:
+            keep = run(frame)
+            if stage == 'engineer_post_date':
+                # the post_date filter decides the rows of every other column
+                self._keep = keep
+                frame = frame[keep]
+            measured['rows_out'] = len(frame)
+        self._stage_cache[stage] = {col: frame[col] for col in writes if col in frame}
+
+    def select(self, columns) -> pd.DataFrame:
+        """
+        The engineered `columns` (same values and rows as in engineer_all),
+        running only the stages that write them. Columns no stage writes
+        (e.g. `job_title`, `skills`) are passed through.
+        """
+        self._run_stage('engineer_post_date')
+        for stage, (reads, writes) in self.STAGES.items():
+            if set(writes) & set(columns):
+                self._run_stage(stage)
+        return pd.DataFrame({col: self._column(col) for col in columns})
@@ -0,0 +1,71 @@
+import re
+
+
+TOKEN_PATTERN = re.compile(r'[^\s,;()]+')
+_END = object()
+
+
+class Gazetteer:
+    """
+    Token trie over place names, compiled once.
+
+    `match` scans a string left to right taking the longest place name that
+    starts at each token, so multi-word names ('Salt Lake City',
+    'Frankfurt am Main') are found inside longer strings. Lookups are hash
+    probes per token, so throughput does not depend on the number of places.
+
+    Ambiguous names map to several countries in priority order; they resolve
+    to the candidate confirmed by another match in the same string, else to
+    the first candidate.
+
+    >>> gazetteer = Gazetteer({'New York': 'United States', 'NY': 'United States'})
+    >>> gazetteer.match('Brooklyn, New York, NY')
+    'United States'
+    """
+    def __init__(self, places: dict, ambiguous: dict = None):
+        self.root = {}
+        for name, country in places.items():
+            self.add(name, [country])
+        for name, countries in (ambiguous or {}).items():
+            self.add(name, list(countries))
+
+    def add(self, name: str, countries: list):
+        node = self.root
+        for token in TOKEN_PATTERN.findall(name):
+            node = node.setdefault(token, {})
+        node[_END] = countries
+
+    def find_all(self, text: str):
+        # leftmost-longest scan -> [(n_tokens, countries), ...]
+        tokens = TOKEN_PATTERN.findall(text)
+        found = []
+        i = 0
+        while i < len(tokens):
+            node = self.root
+            best = None
+            for j in range(i, len(tokens)):
+                node = node.get(tokens[j])
+                if node is None:
+                    break
+                if _END in node:
+                    best = (j - i + 1, node[_END])
+            if best is None:
+                i += 1
+            else:
+                found.append(best)
+                i += best[0]
+        return found
+
+    def match(self, text: str):
+        found = self.find_all(text)
+        if not found:
+            return None
+        # the most specific (longest) place name wins; ties keep the last one,
+        # which in "City, State, Country" strings is the broadest component
+        length, countries = max(reversed(found), key=lambda item: item[0])
+        if len(countries) > 1:
+            confirmed = {c[0] for _, c in found if len(c) == 1}
+            for country in countries:
+                if country in confirmed:
+                    return country
+        return countries[0]
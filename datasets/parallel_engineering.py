@@ -0,0 +1,53 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+try:
+    from .feature_engineering import FeatureEngineer
+except ImportError:
+    from feature_engineering import FeatureEngineer
+
+
+# per-worker state, set once by _init_worker
+_worker = {}
+
+
+def _init_worker(df: pd.DataFrame, reference_date, ownerships):
+    # with fork the frame is inherited rather than pickled; the lookup tables
+    # are built here once per worker and reused by every partition
+    FeatureEngineer(df.iloc[:0])
+    _worker.update(df=df, reference_date=reference_date, ownerships=ownerships)
+
+
+def _engineer_partition(bounds):
+    start, stop = bounds
+    chunk = _worker['df'].iloc[start:stop]
+    return FeatureEngineer(chunk, _worker['reference_date'], _worker['ownerships']).engineer_all()
+
+
+def engineer_all_parallel(df: pd.DataFrame, n_workers=None, chunk_rows=None, reference_date=None):
+    """
+    Run FeatureEngineer.engineer_all over row partitions in a process pool.
+
+    Partitions are concatenated back in their original order, so the result
+    matches a sequential run. Ownership labels are collected from the whole
+    frame up front, so every partition classifies company cells the same way.
+
+    >>> df_ready = engineer_all_parallel(df_features, n_workers=8)
+    """
+    n_workers = n_workers or os.cpu_count() or 1
+    ownerships = df['ownership'].dropna().unique()
+    if n_workers <= 1 or len(df) <= 1:
+        return FeatureEngineer(df, reference_date, ownerships).engineer_all()
+
+    # a few partitions per worker keeps the pool busy when partitions are uneven
+    chunk_rows = chunk_rows or max(1, -(-len(df) // (n_workers * 4)))
+    bounds = [(start, min(start + chunk_rows, len(df))) for start in range(0, len(df), chunk_rows)]
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+    with ProcessPoolExecutor(max_workers=n_workers, mp_context=context, initializer=_init_worker,
+                             initargs=(df, reference_date, ownerships)) as pool:
+        parts = list(pool.map(_engineer_partition, bounds))
+    return pd.concat(parts)
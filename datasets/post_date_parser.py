@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+try:
+    from ._vectorize import map_unique
+except ImportError:
+    from _vectorize import map_unique
+
+
+NUMBER_WORDS = {
+    'a': 1, 'an': 1, 'zero': 0, 'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6,
+    'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10, 'eleven': 11, 'twelve': 12,
+}
+UNIT_DAYS = {'minute': 0, 'hour': 0, 'day': 1, 'week': 7, 'month': 30, 'year': 365}
+
+# "17 days ago", "a month ago", "3 years ago"
+POST_DATE_PATTERN = (
+    r'(?i)^\s*(?P<number>\d+|' + '|'.join(NUMBER_WORDS) + r')\s+'
+    r'(?P<unit>' + '|'.join(UNIT_DAYS) + r')s?\s+ago\s*$'
+)
+
+
+def _parse_days(uniques: pd.Series):
+    parts = uniques.str.extract(POST_DATE_PATTERN)
+    number = parts['number'].str.lower()
+    number = pd.to_numeric(number.map(NUMBER_WORDS).fillna(number), errors='coerce').to_numpy(np.float64)
+    return number * parts['unit'].str.lower().map(UNIT_DAYS).to_numpy(np.float64)
+
+
+def parse_post_date(post_date: pd.Series, reference_date=None):
+    """
+    Parse relative post dates ("17 days ago", "a month ago") in one regex pass.
+
+    Returns a frame with `days_ago` as int32 (-1 where unparsed) and, when a
+    reference scrape date is given, `posted_on` as absolute dates; plus a
+    boolean mask of the rows that could not be parsed, which never raise.
+
+    >>> parsed, unparsed = parse_post_date(df['post_date'], reference_date='2025-06-01')
+    """
+    # each distinct string is parsed once and broadcast back to its rows
+    days = map_unique(post_date, _parse_days, np.nan)
+
+    unparsed = np.isnan(days)
+    parsed = pd.DataFrame({
+        'days_ago': np.where(unparsed, -1, days).astype(np.int32),
+    }, index=post_date.index)
+    if reference_date is not None:
+        reference = np.datetime64(pd.Timestamp(reference_date).normalize().date(), 'D')
+        posted_on = reference - np.where(unparsed, 0, days).astype('timedelta64[D]')
+        parsed['posted_on'] = pd.Series(posted_on, index=post_date.index).where(~unparsed)
+    return parsed, pd.Series(unparsed, index=post_date.index)
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+try:
+    from ._vectorize import map_unique
+except ImportError:
+    from _vectorize import map_unique
+
+
+# "€100,472 - €200,938" (range) or "€118,733" (single value)
+SALARY_PATTERN = r'^\s*€\s*(?P<min>\d[\d,]*(?:\.\d+)?)\s*(?:-\s*€\s*(?P<max>\d[\d,]*(?:\.\d+)?))?\s*$'
+
+
+def _parse_bounds(uniques: pd.Series):
+    parts = uniques.str.extract(SALARY_PATTERN)
+    low = pd.to_numeric(parts['min'].str.replace(',', '', regex=False), errors='coerce').to_numpy(np.float64)
+    high = pd.to_numeric(parts['max'].str.replace(',', '', regex=False), errors='coerce').to_numpy(np.float64)
+    return low, np.where(np.isnan(high), low, high)
+
+
+def parse_salary(salary: pd.Series):
+    """
+    Parse salary strings in a single vectorized regex pass.
+
+    Returns a frame with float64 `min_salary`, `max_salary` and `mean_salary`
+    (single values give min == max) and a boolean mask of the non-missing rows
+    that did not match, which are left as NaN instead of raising.
+
+    >>> salaries, unparsed = parse_salary(df['salary'])
+    """
+    # each distinct string is parsed once and broadcast back to its rows
+    low, high = map_unique(salary, _parse_bounds, (np.nan, np.nan))
+    salaries = pd.DataFrame({
+        'min_salary': low,
+        'max_salary': high,
+        'mean_salary': (low + high) / 2,
+    }, index=salary.index)
+    unparsed = pd.Series(salary.notna().to_numpy() & np.isnan(low), index=salary.index)
+    return salaries, unparsed
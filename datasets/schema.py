@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+
+# object columns with at most this many distinct values per row become categoricals
+MAX_CATEGORY_RATIO = 0.5
+
+
+def _downcast_float(values: pd.Series) -> pd.Series:
+    # float32 only when every value survives the round trip
+    narrow = values.astype(np.float32)
+    if np.array_equal(narrow.to_numpy(np.float64), values.to_numpy(np.float64), equal_nan=True):
+        return narrow
+    return values
+
+
+def _downcast_integer(values: pd.Series) -> pd.Series:
+    if values.isna().any():
+        return values
+    kind = 'unsigned' if len(values) and values.min() >= 0 else 'integer'
+    return pd.to_numeric(values, downcast=kind)
+
+
+def compact_frame(df: pd.DataFrame, max_category_ratio=MAX_CATEGORY_RATIO, source_bytes=None) -> pd.DataFrame:
+    """
+    Return a compact copy of `df`: repetitive string columns become
+    categoricals, i.e. integer codes plus one table of strings, and numeric
+    columns are downcast to the smallest type that holds every value exactly.
+
+    The real per-column bytes before conversion (`source_bytes`, measured on
+    `df` itself when not given) are kept in `attrs['source_bytes']` for
+    `memory_report`.
+
+    >>> df_ready = compact_frame(FeatureEngineer(df_features).engineer_all())
+    """
+    if source_bytes is None:
+        source_bytes = df.memory_usage(deep=True, index=False).to_dict()
+    columns = {}
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_bool_dtype(series) or isinstance(series.dtype, pd.CategoricalDtype):
+            columns[col] = series
+        elif pd.api.types.is_float_dtype(series):
+            columns[col] = _downcast_float(series)
+        elif pd.api.types.is_integer_dtype(series):
+            columns[col] = _downcast_integer(series)
+        elif pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+            if series.nunique(dropna=True) <= max_category_ratio * max(len(series), 1):
+                columns[col] = series.astype('category')
+            else:
+                columns[col] = series
+        else:
+            columns[col] = series
+    compact = pd.DataFrame(columns, index=df.index)
+    compact.attrs['source_bytes'] = {col: int(source_bytes[col]) for col in df.columns if col in source_bytes}
+    return compact
+
+
+def append_frame(df: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    """
+    Rows of `new` appended to `df`, keeping categoricals categorical (the
+    categories are unioned, existing codes are kept) instead of falling
+    back to object columns like a plain `pd.concat` would.
+
+    >>> df = append_frame(df, compact_frame(clean_frame(new_rows)))
+    """
+    columns = {}
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            added = new[col] if isinstance(new[col].dtype, pd.CategoricalDtype) else new[col].astype(object).astype('category')
+            columns[col] = pd.Series(union_categoricals([df[col], added], ignore_order=True))
+        else:
+            columns[col] = pd.concat([pd.Series(df[col]), pd.Series(new[col])], ignore_index=True)
+    appended = pd.DataFrame(columns)
+    old_bytes, new_bytes = df.attrs.get('source_bytes', {}), new.attrs.get('source_bytes', {})
+    appended.attrs['source_bytes'] = {
+        col: old_bytes[col] + new_bytes.get(col, 0) for col in df.columns if col in old_bytes
+    }
+    return appended
+
+
+def memory_report(df: pd.DataFrame) -> dict:
+    """
+    Per-column bytes of `df` as stored (`after`) and as measured before
+    conversion (`before`, from `attrs['source_bytes']`, see compact_frame;
+    columns without a record count their current size).
+    """
+    source_bytes = df.attrs.get('source_bytes', {})
+    columns = {}
+    for col in df.columns:
+        after = int(df[col].memory_usage(deep=True, index=False))
+        columns[col] = {'dtype': str(df[col].dtype), 'before': int(source_bytes.get(col, after)), 'after': after}
+    return {
+        'rows': len(df),
+        'columns': columns,
+        'before': sum(c['before'] for c in columns.values()),
+        'after': sum(c['after'] for c in columns.values()),
+    }
@@ -0,0 +1,22 @@
+import gc
+import os
+
+# el master importa job_analyzer (carga, limpia e indexa el dataset) antes de crear los workers;
+# cada worker lo hereda por fork y comparte esas páginas en lugar de cargar su propia copia
+os.environ.setdefault('JOB_ANALYZER_PRELOAD', '1')
+preload_app = True
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+
+
+def when_ready(server):
+    # se llama en el master ya con la app cargada, antes de crear los workers
+    import job_analyzer
+    job_analyzer.warm_up()
+
+
+def pre_fork(server, worker):
+    # todo lo cargado pasa a la generación permanente del GC: los workers no lo recorren
+    # en cada colección, así no escriben (copy-on-write) en las páginas compartidas
+    gc.freeze()
@@ -0,0 +1,123 @@
+import io
+import logging
+import os
+import threading
+import time
+
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+logger = logging.getLogger(__name__)
+
+
+class TailIngester:
+    """
+    Sigue el CSV del dataset: las filas agregadas al final (por otro proceso
+    o con `append`, ver POST /ingest) se leen desde el último byte consumido,
+    `prepare(raw, version)` arma el estado nuevo y `swap(state)` lo publica.
+    El hash se continúa sobre los bytes nuevos, así la versión es la misma
+    que daría una carga completa.
+
+    >>> digest, size = dataset_digest(DATA_PATH)
+    >>> ingester = TailIngester(DATA_PATH, digest, size, prepare_ingest, swap_dataset)
+    >>> ingester.poll()   # filas nuevas ingeridas
+    """
+    def __init__(self, path, digest, offset, prepare, swap):
+        self.path = path
+        self.digest = digest
+        self.offset = offset
+        self.prepare = prepare
+        self.swap = swap
+        self.lock = threading.Lock()
+        self.watcher_pid = None
+        with open(path, 'rb') as fh:
+            self.columns = list(pd.read_csv(io.BytesIO(fh.readline())).columns)
+
+    def _parse(self, data: bytes) -> pd.DataFrame:
+        # todo como texto, igual que en la carga completa del CSV
+        return pd.read_csv(io.BytesIO(data), header=None, names=self.columns, dtype=str)
+
+    def _build(self, tail: bytes):
+        # filas, hash y estado nuevo para `tail` (bytes a continuación de lo ya ingerido); no publica nada
+        raw = self._parse(tail)
+        digest = self.digest.copy()
+        digest.update(tail)
+        return raw, digest, self.prepare(raw, digest.hexdigest()[:16])
+
+    def _advance(self, tail: bytes, digest, state):
+        self.swap(state)
+        self.digest, self.offset = digest, self.offset + len(tail)
+
+    def poll(self):
+        with self.lock:
+            if os.path.getsize(self.path) < self.offset:
+                # el archivo fue reemplazado o truncado: eso requiere una carga completa
+                logger.warning('%s es más chico que lo ya ingerido; se ignora hasta reiniciar', self.path)
+                return 0
+            with open(self.path, 'rb') as fh:
+                fh.seek(self.offset)
+                tail = fh.read()
+            # solo líneas completas: una escritura a medias se toma en la próxima vuelta
+            tail = tail[:tail.rfind(b'\n') + 1]
+            if not tail.strip():
+                self.offset += len(tail)
+                return 0
+            raw, digest, state = self._build(tail)
+            self._advance(tail, digest, state)
+            return len(raw)
+
+    def append(self, data: bytes):
+        # CSV con la misma cabecera que el dataset; las filas se agregan al archivo
+        # (así el resto de los workers también las toman) y se ingieren acá
+        header, _, rows = data.partition(b'\n')
+        if list(pd.read_csv(io.BytesIO(header)).columns) != self.columns:
+            raise ValueError(f'la cabecera debe ser: {",".join(self.columns)}')
+        if not rows.strip():
+            return 0
+        if not rows.endswith(b'\n'):
+            rows += b'\n'
+        with self.lock, open(self.path, 'a+b') as fh:
+            if fcntl is not None:
+                fcntl.flock(fh, fcntl.LOCK_EX)
+            size = fh.seek(0, os.SEEK_END)
+            # si el archivo no termina en salto de línea, la primera fila nueva quedaría pegada a la última
+            if size > 0:
+                fh.seek(-1, os.SEEK_END)
+                if fh.read(1) != b'\n':
+                    rows = b'\n' + rows
+            # lo que otro proceso agregó y todavía no se ingirió va junto con el lote
+            fh.seek(self.offset)
+            tail = fh.read() + rows
+            # el estado nuevo se arma antes de escribir: un lote que no se puede limpiar
+            # no deja filas en el archivo (el watcher y el próximo arranque fallarían con ellas)
+            raw, digest, state = self._build(tail)
+            try:
+                fh.write(rows)
+                fh.flush()
+            except BaseException:
+                fh.truncate(size)
+                raise
+            self._advance(tail, digest, state)
+            return len(raw)
+
+    def watch(self, interval):
+        # un hilo por proceso: los hilos no sobreviven a un fork, por eso se arranca
+        # desde el primer request de cada worker y no al importar
+        if self.watcher_pid == os.getpid():
+            return
+        self.watcher_pid = os.getpid()
+
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.poll()
+                except Exception:
+                    logger.exception('falló la ingesta de %s', self.path)
+
+        threading.Thread(target=loop, name='dataset-watcher', daemon=True).start()
@@ -1,71 +1,470 @@
-from flask import Flask, jsonify
+import datetime
+import hmac
+
+from flask import Flask, Response, jsonify, request
 import pandas as pd
-from collections import Counter
 from flask_cors import CORS
+import numpy as np
 import os
 
+from aggregates import MaterializedAggregates, dataset_digest, dataset_version, summarize_rows
+from bitmap_index import FILTER_COLUMNS, BitmapIndex
+from columnar_cache import load_cached_frame
+from cooccurrence import COOCCURRENCE_SORTS, SkillCooccurrence
+from dataset_state import DatasetState
+from datasets.company_info_parser import HEADCOUNT, classify_cells
+from datasets.cube import CUBE_COLUMNS, CUBE_DIMENSIONS, OLAPCube
+from datasets.feature_engineering import FeatureEngineer
+from datasets.post_date_parser import parse_post_date
+from datasets.salary_parser import parse_salary
+from datasets.schema import compact_frame, memory_report
+from ingest import TailIngester
+from metrics import (DATASET_ROWS, INGESTED_ROWS, REGISTRY, add_feature_stages, instrument, observe_feature_stages,
+                     observe_process_memory, process_memory, timed)
+from sketches import HEAVY_HITTER_SECTIONS, SALARY_DIMENSIONS
+from snapshots import SnapshotRegistry, UnknownSnapshot
+from skills_index import SkillsIndex
+from streaming import CHUNK_SIZE, PartialAggregates, stream_aggregates
+from trends import GRANULARITIES, TREND_DIMENSIONS, TrendIndex
+
 app = Flask(__name__)
 CORS(app)
+# latencia, requests y bytes por ruta, expuestos en /metrics
+instrument(app)
+
+DATA_PATH = os.environ.get('JOB_ANALYZER_DATA', 'datasets/data_science_job_posts_2025.csv')
+
+# modo streaming: el CSV se procesa en chunks y solo quedan los agregados parciales
+# (memoria acotada, pero sin índices por fila: /query no está disponible)
+STREAMING = os.environ.get('JOB_ANALYZER_STREAMING') == '1'
+# en streaming, contar skills / títulos / compañías solo con sketches (memoria constante)
+APPROXIMATE = os.environ.get('JOB_ANALYZER_APPROXIMATE') == '1'
+HEAVY_HITTER_EPSILON = float(os.environ.get('JOB_ANALYZER_HEAVY_HITTER_EPSILON', 0.001))
+# modo preload (gunicorn.conf.py): el master carga e indexa una vez y los workers lo heredan por fork;
+# todas las columnas de texto quedan como códigos + tabla de strings para no escribir páginas compartidas
+PRELOAD = os.environ.get('JOB_ANALYZER_PRELOAD') == '1'
+# fecha del scrape (YYYY-MM-DD): post_date es relativo ("17 days ago"); con ella /trends da fechas
+REFERENCE_DATE = os.environ.get('JOB_ANALYZER_REFERENCE_DATE')
+REFERENCE_DATE = datetime.date.fromisoformat(REFERENCE_DATE) if REFERENCE_DATE else None
+
+# limpiar datos (los salarios vienen como texto con € y algunos con rangos: se usa el promedio;
+# company_size pasa a número de empleados, NaN si la celda trae otra cosa, y post_date a días atrás,
+# -1 si no se puede leer: así compact_frame los achica a float32 / int16)
+def clean_frame(df):
+    with timed('clean'):
+        salaries, unparsed = parse_salary(df['salary'])
+        if unparsed.any():
+            app.logger.warning('%d salarios no se pudieron parsear', int(unparsed.sum()))
+        df['salary'] = salaries['mean_salary']
+        kinds, numbers, _ = classify_cells(df['company_size'], ())
+        df['company_size'] = np.where(kinds == HEADCOUNT, numbers, np.nan)
+        df['post_date'] = parse_post_date(df['post_date'])[0]['days_ago']
+    return df
+
+# columnas repetitivas como categóricas y números con el tipo más chico posible
+# (con los bytes reales de cada columna antes de convertirla, para /debug/memory)
+def load_data(path):
+    with timed('read_csv'):
+        raw = pd.read_csv(path)
+    source_bytes = raw.memory_usage(deep=True, index=False).to_dict()
+    df = clean_frame(raw)
+    with timed('compact'):
+        return compact_frame(df, source_bytes=source_bytes)
+
+# celdas base del cubo OLAP: FeatureEngineer por chunks, solo se conservan las celdas agregadas
+# (las etiquetas de ownership se juntan del archivo entero, así la clasificación no depende de los cortes).
+# Una ubicación sin continente queda como celda faltante: el cubo nunca impide levantar la app
+def load_cube_cells(path):
+    with timed('cube_features'):
+        ownerships = pd.read_csv(path, usecols=['ownership'])['ownership'].dropna().unique()
+        stage_metrics = {}
+
+        def features(chunk):
+            fe = FeatureEngineer(chunk, ownerships=ownerships, copy=False, strict=False)
+            frame = fe.select(CUBE_COLUMNS)
+            add_feature_stages(stage_metrics, fe.metrics)
+            unresolved = len(fe.parse_errors['location']) + len(fe.parse_errors['headquarter'])
+            if unresolved:
+                app.logger.warning('%d ubicaciones sin continente quedaron como faltantes en el cubo', unresolved)
+            return frame
+
+        base = OLAPCube.from_frames(features(chunk) for chunk in pd.read_csv(path, chunksize=CHUNK_SIZE)).base
+    # duración por etapa de FeatureEngineer en /metrics (job_analyzer_feature_stage_*)
+    observe_feature_stages(stage_metrics)
+    return base
+
+# carga completa de un CSV: frame, índices, agregados, sketches y cubo (solo agregados en streaming)
+def load_dataset(path, version):
+    # cubo sobre las dimensiones de FeatureEngineer (entrada de caché propia, con sufijo .cube)
+    with timed('cube'):
+        cube = OLAPCube(load_cached_frame(path + '.cube', version, lambda _: load_cube_cells(path)))
+
+    if STREAMING:
+        with timed('stream'):
+            partial = stream_aggregates(path, clean_frame, exact=not APPROXIMATE, epsilon=HEAVY_HITTER_EPSILON)
+        aggregates = MaterializedAggregates.from_results(
+            partial.results(), version, app.json.dumps, partial.rankings()
+        )
+        return DatasetState(version, partial.rows, aggregates, partial, cube)
+
+    # el dataset limpio se lee de la caché columnar (se reconstruye si cambia el CSV)
+    with timed('load'):
+        df = load_cached_frame(path, version, load_data, categorical=PRELOAD)
+
+    # índice disperso oferta x habilidad (único motor para todo lo relacionado a skills): los códigos
+    # por habilidad reemplazan a la columna de texto, que ya no se guarda en el frame servido
+    with timed('skills_index'):
+        skills = SkillsIndex.from_series(df['skills'])
+        df = df.drop(columns='skills')
+
+    # índices por columna (listas de filas / bitmaps) para los filtros de /query
+    with timed('bitmaps'):
+        bitmaps = BitmapIndex.from_frame(df)
+
+    # precalcular todos los endpoints una sola vez por versión del dataset
+    with timed('aggregates'):
+        aggregates = MaterializedAggregates.build(df, skills, version, app.json.dumps, bitmaps)
+
+    # co-ocurrencia de habilidades (Gram disperso X.T @ X) para /skill_cooccurrence
+    with timed('cooccurrence'):
+        cooccurrence = SkillCooccurrence.from_index(skills, df['salary'])
+
+    # agregados sumables para la ingesta incremental, con los sketches de cuantiles de salario
+    # y de heavy hitters (?approx=1 en top_skills / most_wanted_jobs / top_companies)
+    with timed('partial'):
+        partial = PartialAggregates(epsilon=HEAVY_HITTER_EPSILON).update(df, skills)
+
+    # día de publicación x clave (skill, compañía, ...) para las series de /trends
+    with timed('trends'):
+        trends = TrendIndex.from_index(df['post_date'], df['salary'], skills, bitmaps, reference_date=REFERENCE_DATE)
+
+    return DatasetState(version, len(df), aggregates, partial, cube,
+                        df=df, skills=skills, bitmaps=bitmaps, cooccurrence=cooccurrence, trends=trends)
+
+DATASET_DIGEST, DATASET_SIZE = dataset_digest(DATA_PATH)
+
+# desde acá todo se lee de `dataset` (se reemplaza entero en cada ingesta)
+dataset = load_dataset(DATA_PATH, DATASET_DIGEST.hexdigest()[:16])
+DATASET_ROWS.set(dataset.rows)
+# proceso que cargó el dataset (en preload, el master: los workers lo comparten)
+LOADED_PID = os.getpid()
+
+# -------------------------
+# Snapshots
+# -------------------------
+# otros CSV (ej. el scrape de 2024 o un extracto por región) en JOB_ANALYZER_SNAPSHOTS_DIR,
+# servidos con ?dataset=<nombre del archivo sin .csv>; se cargan al primer pedido y se descartan
+# los menos usados cuando pasan JOB_ANALYZER_SNAPSHOT_BUDGET_MB (el dataset principal no cuenta)
+SNAPSHOTS_DIR = os.environ.get('JOB_ANALYZER_SNAPSHOTS_DIR')
+SNAPSHOT_BUDGET_BYTES = int(float(os.environ.get('JOB_ANALYZER_SNAPSHOT_BUDGET_MB', 1024)) * (1 << 20))
+
+def dataset_bytes(state):
+    return state.nbytes(app.json.dumps)
+
+snapshots = SnapshotRegistry(
+    SNAPSHOTS_DIR, SNAPSHOT_BUDGET_BYTES, lambda path: load_dataset(path, dataset_version(path)), dataset_bytes
+) if SNAPSHOTS_DIR else None
+
+# estado del dataset pedido con ?dataset= (el principal si no se pide ninguno)
+def current_dataset():
+    name = request.args.get('dataset')
+    if not name:
+        return dataset
+    if snapshots is None:
+        raise UnknownSnapshot(name)
+    return snapshots.get(name)
 
-# función para limpiar salarios (vienen en formato string, con símbolos de euros y algunos con rangos)
-def clean_salary(salary_str):
-    if pd.isna(salary_str):
+@app.errorhandler(UnknownSnapshot)
+def unknown_snapshot(error):
+    available = snapshots.available() if snapshots is not None else []
+    return jsonify(error='dataset desconocido', dataset=error.args[0], datasets=available), 404
+
+# -------------------------
+# Ingesta incremental
+# -------------------------
+# las filas nuevas se agregan al final del CSV; cada worker las toma desde el último byte leído
+# (cada JOB_ANALYZER_WATCH_SECONDS, o al momento con POST /ingest y el token de ingesta)
+INGEST_TOKEN = os.environ.get('JOB_ANALYZER_INGEST_TOKEN')
+# con ingesta por POST el watcher va siempre: el POST lo atiende un solo worker y el resto
+# toma las filas del archivo (si no, seguirían sirviendo la versión anterior)
+WATCH_SECONDS = float(os.environ.get('JOB_ANALYZER_WATCH_SECONDS', 5 if INGEST_TOKEN else 0))
+
+def prepare_ingest(raw, version):
+    # estado nuevo con las filas agregadas; si falla, nada cambia
+    with timed('ingest'):
+        return dataset.append(raw, version, clean_frame, app.json.dumps)
+
+def swap_dataset(state):
+    global dataset
+    added = state.rows - dataset.rows
+    # un solo reemplazo de referencia: los requests en curso siguen con el estado anterior
+    dataset = state
+    DATASET_ROWS.set(dataset.rows)
+    INGESTED_ROWS.inc(added)
+
+ingester = TailIngester(DATA_PATH, DATASET_DIGEST, DATASET_SIZE, prepare_ingest, swap_dataset)
+
+@app.before_request
+def _start_watcher():
+    # en preload el master no sirve requests (salvo warm_up): cada worker sigue el CSV por su cuenta
+    if WATCH_SECONDS > 0 and not (PRELOAD and os.getpid() == LOADED_PID):
+        ingester.watch(WATCH_SECONDS)
+
+MAX_PAGE_SIZE = 1000
+
+# parámetros de listado: ?n=50&offset=100&order=asc&min_count=5 (None si no se pidió ninguno)
+def list_params():
+    args = request.args
+    if not any(key in args for key in ('n', 'offset', 'order', 'min_count')):
         return None
-    if ' - ' in str(salary_str):
-        # Si es rango, tomar el promedio
-        low, high = str(salary_str).replace('€', '').replace(',', '').split(' - ')
-        return (float(low) + float(high)) / 2
-    else:
-        # Si es valor único
-        return float(str(salary_str).replace('€', '').replace(',', ''))
-
-# cargar y limpiar datos
-df = pd.read_csv('datasets/data_science_job_posts_2025.csv')
-df['salary'] = df['salary'].apply(clean_salary)
+    n = min(max(args.get('n', 10, type=int), 0), MAX_PAGE_SIZE)
+    offset = max(args.get('offset', 0, type=int), 0)
+    order = 'asc' if args.get('order') == 'asc' else 'desc'
+    min_count = max(args.get('min_count', 1, type=int), 1)
+    return n, offset, order, min_count
+
+# responder con los bytes ya serializados; ETag fuerte + 304 si el cliente ya lo tiene
+def serve_aggregate(name):
+    state = current_dataset()
+    if name in HEAVY_HITTER_SECTIONS and request.args.get('approx') == '1':
+        n = min(max(request.args.get('n', 10, type=int), 0), MAX_PAGE_SIZE)
+        return jsonify(state.heavy_hitters.result(name, n))
+    aggregates = state.aggregates
+    params = list_params()
+    payload = aggregates.payloads[name] if params is None else aggregates.page(name, *params)
+    response = Response(payload, mimetype='application/json')
+    response.set_etag(aggregates.etag(name, params))
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
 
 @app.route("/top_skills")
 # buscar habilidades más requeridas
 def top_skills():
-    skills = df['skills']
-    skills_counter = Counter()
-    for sublist in skills.dropna().str.split(','):
-        skills_counter.update([skill.strip() for skill in sublist])
-    return jsonify(skills_counter.most_common(10))
+    return serve_aggregate('top_skills')
 
 @app.route("/avg_salary_by_level")
 # salario promedio por nivel de seniority
 def avg_salary_by_level():
-    salary_by_level = df.dropna(subset=['salary']).groupby('seniority_level')['salary'].mean().to_dict()
-    return jsonify(salary_by_level)
+    return serve_aggregate('avg_salary_by_level')
 
 @app.route("/most_wanted_jobs")
 # trabajos más buscados
 def most_wanted_jobs():
-    wanted_jobs = df['job_title'].value_counts().head(10).to_dict()
-    return jsonify(wanted_jobs)
+    return serve_aggregate('most_wanted_jobs')
 
 @app.route("/top_companies")
 # compañías con más ofertas
 def top_companies():
-    top_companies = df['company'].value_counts().head(10).to_dict()
-    return jsonify(top_companies)
+    return serve_aggregate('top_companies')
 
 @app.route("/avg_salary_by_technology")
 # salario promedio por tecnología
 def avg_salary_by_technology():
-    df_expanded = df.dropna(subset=['salary', 'skills'])['skills'].str.split(',', expand=True).stack().str.strip()
-    df_expanded = df_expanded.to_frame('skill').reset_index(level=1, drop=True)
-    df_expanded['salary'] = df.dropna(subset=['salary', 'skills'])['salary']
-    tech_salary = df_expanded.groupby('skill')['salary'].mean().sort_values(ascending=False).head(10).to_dict()
-    return jsonify(tech_salary)
+    return serve_aggregate('avg_salary_by_technology')
 
 @app.route("/jobs_by_location")
 # trabajos por ubicación
 def jobs_by_location():
-    jobs_location = df['location'].dropna().value_counts().head(10).to_dict()
-    return jsonify(jobs_location)
+    return serve_aggregate('jobs_by_location')
+
+@app.route("/dashboard")
+# todos los endpoints en una sola respuesta; ?sections=top_skills,top_companies para elegir
+# (acepta los mismos parámetros de listado que cada endpoint)
+def dashboard():
+    aggregates = current_dataset().aggregates
+    requested = request.args.get('sections')
+    sections = tuple(sorted(set(requested.split(',')))) if requested else tuple(sorted(aggregates.payloads))
+    unknown = [name for name in sections if name not in aggregates.payloads]
+    if unknown:
+        return jsonify(error='secciones desconocidas', sections=unknown), 400
+    params = list_params()
+    response = Response(aggregates.dashboard(sections, params), mimetype='application/json')
+    response.set_etag(aggregates.etag('dashboard', sections + (params or ())))
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+@app.route("/query")
+# consulta filtrable, ej: /query?seniority_level=senior&ownership=Public&min_salary=100000
+# (un filtro se puede repetir para pedir varios valores)
+def query():
+    state = current_dataset()
+    bitmaps = state.bitmaps
+    if bitmaps is None:
+        return jsonify(error='/query no está disponible en modo streaming'), 501
+    filters = {col: request.args.getlist(col) for col in FILTER_COLUMNS}
+    rows = bitmaps.select(
+        filters,
+        min_salary=request.args.get('min_salary', type=float),
+        max_salary=request.args.get('max_salary', type=float),
+    )
+    return jsonify(summarize_rows(bitmaps, state.skills, rows))
+
+@app.route("/skill_cooccurrence")
+# habilidades pedidas juntas: ?skill=spark para una habilidad, sin skill para los pares más frecuentes
+# (sort=count|lift|salary_premium, n, min_count)
+def skill_cooccurrence():
+    state = current_dataset()
+    cooccurrence = state.cooccurrence
+    if cooccurrence is None:
+        return jsonify(error='/skill_cooccurrence no está disponible en modo streaming'), 501
+    skill = request.args.get('skill')
+    if skill is not None and skill not in cooccurrence.ids:
+        return jsonify(error='habilidad desconocida', skill=skill), 404
+    sort = request.args.get('sort', 'count')
+    if sort not in COOCCURRENCE_SORTS:
+        return jsonify(error='orden desconocido', sort=sort, sorts=list(COOCCURRENCE_SORTS)), 400
+    n = min(max(request.args.get('n', 10, type=int), 0), MAX_PAGE_SIZE)
+    min_count = max(request.args.get('min_count', 1, type=int), 1)
+    params = (skill, n, sort, min_count)
+    response = jsonify(cooccurrence.query(*params))
+    response.set_etag(state.aggregates.etag('skill_cooccurrence', params))
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+@app.route("/salary_percentiles")
+# percentiles e histograma de salario por grupo, ej: /salary_percentiles?by=skill&q=10,50,90&bins=10
+# (valores aproximados, calculados con sketches KLL)
+def salary_percentiles():
+    by = request.args.get('by', 'seniority_level')
+    if by not in SALARY_DIMENSIONS:
+        return jsonify(error='dimensión desconocida', by=by, dimensions=list(SALARY_DIMENSIONS)), 400
+    try:
+        qs = [float(q) / 100 for q in request.args.get('q', '10,50,90').split(',')]
+    except ValueError:
+        return jsonify(error='q debe ser una lista de percentiles, ej: 10,50,90'), 400
+    if not all(0 <= q <= 1 for q in qs):
+        return jsonify(error='los percentiles van de 0 a 100'), 400
+    bins = min(max(request.args.get('bins', 10, type=int), 0), 100)
+    min_count = max(request.args.get('min_count', 1, type=int), 1)
+    return jsonify(current_dataset().salary_sketches.summary(by, qs, bins, min_count))
+
+@app.route("/cube")
+# agregados del cubo, ej: /cube?group_by=location,seniority_level&industry=Retail&measure=mean_salary
+# (dimensiones de FeatureEngineer; un filtro se puede repetir para pedir varios valores)
+def cube_query():
+    cube = current_dataset().cube
+    group_by = [dim for dim in request.args.get('group_by', '').split(',') if dim]
+    filters = {dim: request.args.getlist(dim) for dim in CUBE_DIMENSIONS}
+    try:
+        result = cube.query(group_by, filters, request.args.get('measure', 'mean_salary'))
+    except KeyError as error:
+        return jsonify(error='parámetros del cubo inválidos', detail=error.args[0], dimensions=list(CUBE_DIMENSIONS), measures=list(cube.measures)), 400
+    return jsonify(result)
+
+# parámetros comunes de /trends: dimensión, granularidad y ventana (en buckets)
+def trend_params(default_by):
+    by = request.args.get('by', default_by)
+    if by not in TREND_DIMENSIONS:
+        return None, (jsonify(error='dimensión desconocida', by=by, dimensions=list(TREND_DIMENSIONS)), 400)
+    granularity = request.args.get('granularity', 'week')
+    if granularity not in GRANULARITIES:
+        return None, (jsonify(error='granularidad desconocida', granularity=granularity,
+                              granularities=list(GRANULARITIES)), 400)
+    window = min(max(request.args.get('window', 4, type=int), 1), 52)
+    n = min(max(request.args.get('n', 10, type=int), 0), MAX_PAGE_SIZE)
+    return (by, granularity, window, n), None
+
+def serve_trend(state, name, params, compute):
+    if state.trends is None:
+        return jsonify(error='/trends no está disponible en modo streaming'), 501
+    response = jsonify(compute(state.trends))
+    response.set_etag(state.aggregates.etag(name, params))
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+@app.route("/trends")
+# demanda y salario por semana / mes, ej: /trends?by=skill&keys=python,spark&granularity=week&window=4
+# (sin keys: las n claves con más ofertas)
+def trends():
+    params, error = trend_params('skill')
+    if error:
+        return error
+    by, granularity, window, n = params
+    keys = tuple(key for key in request.args.get('keys', '').split(',') if key)
+    state = current_dataset()
+    if state.trends is not None:
+        unknown = [key for key in keys if key not in state.trends.ids[by]]
+        if unknown:
+            return jsonify(error='claves desconocidas', by=by, keys=unknown), 404
+    return serve_trend(state, 'trends', (by, granularity, window, n) + keys,
+                       lambda index: index.series(by, keys, granularity, window, n))
+
+@app.route("/trends/movers")
+# claves que más suben / bajan en participación: últimos `window` buckets contra los anteriores
+def trend_movers():
+    params, error = trend_params('skill')
+    if error:
+        return error
+    by, granularity, window, n = params
+    min_count = max(request.args.get('min_count', 5, type=int), 1)
+    return serve_trend(current_dataset(), 'trends_movers', params + (min_count,),
+                       lambda index: index.movers(by, granularity, window, n, min_count))
+
+@app.route("/trends/hiring_velocity")
+# ofertas por semana / mes de cada compañía en la ventana reciente y la anterior
+def hiring_velocity():
+    params, error = trend_params('company')
+    if error:
+        return error
+    by, granularity, window, n = params
+    min_count = max(request.args.get('min_count', 1, type=int), 1)
+    return serve_trend(current_dataset(), 'hiring_velocity', params + (min_count,),
+                       lambda index: index.velocity(by, granularity, window, n, min_count))
+
+@app.route("/debug/memory")
+# bytes por columna antes / después de compactar, más los índices derivados
+def debug_memory():
+    state = current_dataset()
+    report = memory_report(state.df) if state.df is not None else {}
+    report['indexes'] = state.memory(app.json.dumps)
+    report['process'] = dict(process_memory(), pid=os.getpid())
+    return jsonify(report)
+
+@app.route("/datasets")
+# dataset principal y snapshots: cargados (bytes, filas, versión), en carga o disponibles
+def datasets():
+    state = dataset
+    report = snapshots.report() if snapshots is not None else {'budget_bytes': 0, 'used_bytes': 0, 'lru': [], 'snapshots': {}}
+    report['default'] = {'path': DATA_PATH, 'version': state.version, 'rows': state.rows, 'bytes': dataset_bytes(state)}
+    return jsonify(report)
+
+@app.route("/ingest", methods=["POST"])
+# agrega ofertas nuevas: CSV con la misma cabecera que el dataset, con Authorization: Bearer <token>
+def ingest():
+    if request.args.get('dataset'):
+        return jsonify(error='la ingesta solo aplica al dataset principal'), 400
+    if not INGEST_TOKEN:
+        return jsonify(error='ingesta deshabilitada (falta JOB_ANALYZER_INGEST_TOKEN)'), 403
+    supplied = request.headers.get('Authorization', '')
+    if not hmac.compare_digest(supplied.encode(), f'Bearer {INGEST_TOKEN}'.encode()):
+        return jsonify(error='token inválido'), 401
+    try:
+        added = ingester.append(request.get_data())
+    except ValueError as error:
+        return jsonify(error=str(error)), 400
+    state = dataset
+    return jsonify(ingested=added, version=state.version, rows=state.rows)
+
+@app.route("/ready")
+# readiness: responde cuando el dataset está cargado e indexado en este proceso
+# (shared = heredado del master por fork en modo preload)
+def ready():
+    state = dataset
+    return jsonify(status='ready', version=state.version, rows=state.rows, pid=os.getpid(),
+                   preload=PRELOAD, shared=os.getpid() != LOADED_PID)
+
+@app.route("/metrics")
+# métricas en formato de texto de Prometheus
+def metrics():
+    observe_process_memory()
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+# preload: un request en el master antes del fork, así los imports y cachés que arma el primer
+# request quedan en páginas compartidas en lugar de repetirse en cada worker (ver gunicorn.conf.py)
+def warm_up():
+    with app.test_client() as client:
+        client.get('/ready')
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5000))
     app.run(host="0.0.0.0", port=port, debug=False)
-
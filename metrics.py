@@ -0,0 +1,192 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import g, request
+
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _labels(names, values):
+    if not names:
+        return ''
+    pairs = ','.join(f'{name}="{value}"' for name, value in zip(names, values))
+    return '{' + pairs + '}'
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(labels)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def key(self, labels):
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def header(self):
+        return [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} {self.kind}']
+
+    def render(self):
+        with self.lock:
+            items = sorted(self.values.items())
+        return self.header() + [f'{self.name}{_labels(self.label_names, key)} {value}' for key, value in items]
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = value
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self.key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            state = self.values.get(key)
+            if state is None:
+                # [conteo por bucket (no acumulado) + overflow, suma, cantidad]
+                state = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def render(self):
+        with self.lock:
+            items = sorted((key, (list(counts), total, n)) for key, (counts, total, n) in self.values.items())
+        lines = self.header()
+        names = self.label_names + ('le',)
+        for key, (counts, total, n) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{_labels(names, key + (bound,))} {cumulative}')
+            lines.append(f'{self.name}_sum{_labels(self.label_names, key)} {total}')
+            lines.append(f'{self.name}_count{_labels(self.label_names, key)} {n}')
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+REQUEST_SECONDS = REGISTRY.add(Histogram('job_analyzer_request_seconds', 'Latencia por ruta.', ('route',)))
+REQUESTS = REGISTRY.add(Counter('job_analyzer_requests_total', 'Requests por ruta y estado.', ('route', 'method', 'status')))
+RESPONSE_BYTES = REGISTRY.add(Counter('job_analyzer_response_bytes_total', 'Bytes de respuesta por ruta.', ('route',)))
+LOAD_SECONDS = REGISTRY.add(Gauge('job_analyzer_load_seconds', 'Duración de cada etapa de carga del dataset.', ('stage',)))
+DATASET_ROWS = REGISTRY.add(Gauge('job_analyzer_dataset_rows', 'Filas del dataset cargado.'))
+INGESTED_ROWS = REGISTRY.add(Counter('job_analyzer_ingested_rows_total', 'Filas agregadas por ingesta incremental.'))
+SNAPSHOT_BYTES = REGISTRY.add(Gauge('job_analyzer_snapshot_bytes', 'Bytes de cada snapshot cargado (0 si fue descartado).', ('snapshot',)))
+SNAPSHOT_LOADS = REGISTRY.add(Counter('job_analyzer_snapshot_loads_total', 'Cargas de cada snapshot.', ('snapshot',)))
+SNAPSHOT_EVICTIONS = REGISTRY.add(Counter('job_analyzer_snapshot_evictions_total', 'Snapshots descartados por el presupuesto de memoria.', ('snapshot',)))
+PROCESS_MEMORY = REGISTRY.add(Gauge('job_analyzer_process_memory_bytes', 'Memoria de este proceso (rss, pss, uss = páginas privadas).', ('kind',)))
+FEATURE_SECONDS = REGISTRY.add(Gauge('job_analyzer_feature_stage_seconds', 'Duración de cada etapa de FeatureEngineer.', ('stage',)))
+FEATURE_ROWS = REGISTRY.add(Gauge('job_analyzer_feature_stage_rows', 'Filas de entrada/salida por etapa de FeatureEngineer.', ('stage', 'side')))
+FEATURE_PEAK = REGISTRY.add(Gauge('job_analyzer_feature_stage_peak_rss_bytes', 'Pico de RSS del proceso al terminar cada etapa.', ('stage',)))
+
+
+def process_memory(pid='self'):
+    # rss / pss / uss (memoria única: páginas privadas, lo que cuesta cada worker extra) en bytes,
+    # desde /proc/<pid>/smaps_rollup; {} fuera de Linux
+    try:
+        with open(f'/proc/{pid}/smaps_rollup', encoding='ascii') as fh:
+            # líneas "Rss:   1412 kB" (la primera es el rango de direcciones)
+            fields = {parts[0].rstrip(':'): int(parts[1]) * 1024
+                      for parts in map(str.split, fh) if len(parts) == 3 and parts[2] == 'kB'}
+    except OSError:
+        return {}
+    return {
+        'rss': fields.get('Rss', 0),
+        'pss': fields.get('Pss', 0),
+        'uss': fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0),
+    }
+
+
+def observe_process_memory():
+    for kind, value in process_memory().items():
+        PROCESS_MEMORY.set(value, kind=kind)
+
+
+@contextmanager
+def timed(stage):
+    # duración de una etapa de carga: with timed('read_csv'): ...
+    start = time.perf_counter()
+    yield
+    LOAD_SECONDS.set(time.perf_counter() - start, stage=stage)
+
+
+def add_feature_stages(total: dict, stage_metrics: dict):
+    # acumula las métricas de FeatureEngineer de varios chunks (tiempo y filas sumados)
+    for stage, values in stage_metrics.items():
+        entry = total.setdefault(stage, {'seconds': 0.0, 'rows_in': 0, 'rows_out': 0})
+        entry['seconds'] += values['seconds']
+        entry['rows_in'] += values['rows_in']
+        entry['rows_out'] += values['rows_out']
+        # pico del proceso: el último es el mayor
+        entry['peak_rss_bytes'] = values.get('peak_rss_bytes')
+    return total
+
+
+def observe_feature_stages(stage_metrics: dict):
+    # métricas que devuelve FeatureEngineer.engineer_all(return_metrics=True)
+    for stage, values in stage_metrics.items():
+        FEATURE_SECONDS.set(values['seconds'], stage=stage)
+        FEATURE_ROWS.set(values['rows_in'], stage=stage, side='in')
+        FEATURE_ROWS.set(values['rows_out'], stage=stage, side='out')
+        if values.get('peak_rss_bytes') is not None:
+            FEATURE_PEAK.set(values['peak_rss_bytes'], stage=stage)
+
+
+def instrument(app):
+    # latencia, conteo y bytes por ruta (la regla, no la URL, para acotar las etiquetas)
+    @app.before_request
+    def _start_timer():
+        g.request_start = time.perf_counter()
+
+    @app.after_request
+    def _record_request(response):
+        start = g.pop('request_start', None)
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        if start is not None:
+            REQUEST_SECONDS.observe(time.perf_counter() - start, route=route)
+        REQUESTS.inc(route=route, method=request.method, status=response.status_code)
+        RESPONSE_BYTES.inc(response.content_length or 0, route=route)
+        return response
+
+    return app
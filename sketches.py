@@ -0,0 +1,364 @@
+import heapq
+import itertools
+import math
+
+import numpy as np
+import pandas as pd
+
+from skills_index import SkillsIndex
+
+
+# -------------------------
+# Cuantiles: sketch KLL
+# -------------------------
+class KLLSketch:
+    """
+    Sketch KLL de cuantiles: memoria acotada (unos 3k valores como máximo)
+    sin importar cuántos valores se agreguen, con error de rango ~1.5% para
+    k=200. Se puede combinar con `merge` (sketches de distintos chunks o
+    workers).
+
+    >>> sketch = KLLSketch()
+    >>> sketch.update_many(salaries)
+    >>> sketch.quantiles([0.1, 0.5, 0.9])
+    """
+    def __init__(self, k=200, c=2 / 3, seed=0):
+        self.k = k
+        self.c = c
+        self.rng = np.random.default_rng(seed)
+        # levels[h]: valores con peso 2**h
+        self.levels = [np.empty(0)]
+        self.n = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self._sorted = None
+
+    @property
+    def nbytes(self):
+        return sum(items.nbytes for items in self.levels)
+
+    def capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * self.c ** depth)))
+
+    def update(self, value):
+        self.update_many([value])
+
+    def update_many(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return self
+        self.n += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.levels[0] = np.concatenate((self.levels[0], values))
+        self._compress()
+        return self
+
+    def _compress(self):
+        self._sorted = None
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            capacity = self.capacity(level)
+            if len(items) >= capacity:
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # se compactan los valores más chicos (una cantidad par) y el resto queda en el nivel:
+                # de cada par se promueve uno, con desplazamiento al azar
+                compacted = (len(items) - capacity // 2) // 2 * 2
+                offset = int(self.rng.integers(2))
+                self.levels[level + 1] = np.concatenate((self.levels[level + 1], items[offset:compacted:2]))
+                self.levels[level] = items[compacted:]
+            level += 1
+
+    def merge(self, other: 'KLLSketch'):
+        for level, items in enumerate(other.levels):
+            if level == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[level] = np.concatenate((self.levels[level], items))
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def _weighted(self):
+        if self._sorted is None:
+            values = np.concatenate(self.levels)
+            weights = np.concatenate([np.full(len(items), 2 ** level) for level, items in enumerate(self.levels)])
+            order = np.argsort(values, kind='stable')
+            self._sorted = values[order], np.cumsum(weights[order])
+        return self._sorted
+
+    def quantiles(self, qs):
+        if self.n == 0:
+            return [None for _ in qs]
+        values, cumulative = self._weighted()
+        total = cumulative[-1]
+        positions = np.searchsorted(cumulative, np.asarray(qs, dtype=np.float64) * total, side='left')
+        positions = np.minimum(positions, len(values) - 1)
+        result = values[positions]
+        # los extremos se conocen exactos
+        result = np.where(np.asarray(qs) <= 0, self.min, np.where(np.asarray(qs) >= 1, self.max, result))
+        return [float(v) for v in result]
+
+    def histogram(self, edges):
+        # cantidad (aproximada) de valores por intervalo, escalada a n
+        values, cumulative = self._weighted()
+        if not len(values):
+            return [0] * (len(edges) - 1)
+        weights = np.diff(np.concatenate(([0], cumulative)))
+        counts, _ = np.histogram(values, bins=edges, weights=weights)
+        return [int(round(c)) for c in counts * (self.n / cumulative[-1])]
+
+    def to_dict(self):
+        return {'k': self.k, 'c': self.c, 'n': self.n, 'min': self.min, 'max': self.max,
+                'levels': [items.tolist() for items in self.levels]}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(k=data['k'], c=data['c'])
+        sketch.levels = [np.asarray(items, dtype=np.float64) for items in data['levels']]
+        sketch.n, sketch.min, sketch.max = data['n'], data['min'], data['max']
+        return sketch
+
+
+# -------------------------
+# Sketches de salario por grupo
+# -------------------------
+SALARY_DIMENSIONS = ('seniority_level', 'skill', 'location', 'industry')
+
+
+class SalarySketches:
+    """
+    Un KLLSketch de salarios por grupo de cada dimensión (nivel, skill,
+    ubicación, industria). Se llena por chunks con `update_frame` y los
+    parciales se combinan con `merge`.
+
+    >>> sketches = SalarySketches().update_frame(df)
+    >>> sketches.summary('seniority_level', [0.1, 0.5, 0.9], bins=10)
+    """
+    def __init__(self, k=200, salary_column='salary'):
+        self.k = k
+        self.salary_column = salary_column
+        self.groups = {dimension: {} for dimension in SALARY_DIMENSIONS}
+        self.overall = KLLSketch(k)
+
+    @property
+    def nbytes(self):
+        return self.overall.nbytes + sum(s.nbytes for groups in self.groups.values() for s in groups.values())
+
+    def _sketch(self, dimension, key):
+        sketch = self.groups[dimension].get(key)
+        if sketch is None:
+            sketch = self.groups[dimension][key] = KLLSketch(self.k)
+        return sketch
+
+    def update_frame(self, df: pd.DataFrame, skills: SkillsIndex = None):
+        salary = df[self.salary_column].astype(np.float64)
+        valid = salary.notna().to_numpy()
+        self.overall.update_many(salary.to_numpy()[valid])
+        for dimension in ('seniority_level', 'location', 'industry'):
+            for key, values in salary[valid].groupby(df[dimension][valid], observed=True):
+                self._sketch(dimension, key).update_many(values.to_numpy())
+
+        # por skill: la fila j de la transpuesta CSR lista las ofertas con esa skill
+        skills = skills if skills is not None else SkillsIndex.from_series(df['skills'])
+        salary = salary.to_numpy()
+        matrix_t = skills.matrix_t
+        for j, name in enumerate(skills.names):
+            rows = matrix_t.indices[matrix_t.indptr[j]:matrix_t.indptr[j + 1]]
+            values = salary[rows]
+            values = values[~np.isnan(values)]
+            if len(values):
+                self._sketch('skill', name).update_many(values)
+        return self
+
+    def merge(self, other: 'SalarySketches'):
+        self.overall.merge(other.overall)
+        for dimension, groups in other.groups.items():
+            for key, sketch in groups.items():
+                self._sketch(dimension, key).merge(sketch)
+        return self
+
+    def edges(self, bins):
+        # bordes en cuantiles del total (p1 ... p99) y los extremos como bins abiertos a cada lado:
+        # un salario atípico no deja a todos los demás en el primer bin
+        if self.overall.n == 0:
+            return []
+        inner = self.overall.quantiles(np.linspace(0.01, 0.99, bins - 1)) if bins > 1 else []
+        return np.unique([self.overall.min, *inner, self.overall.max]).tolist()
+
+    def summary(self, dimension, qs=(0.1, 0.5, 0.9), bins=10, min_count=1):
+        edges = self.edges(bins) if bins else []
+        result = {}
+        for key, sketch in self.groups[dimension].items():
+            if sketch.n < min_count:
+                continue
+            entry = {'count': sketch.n}
+            for q, value in zip(qs, sketch.quantiles(qs)):
+                entry[f'p{q * 100:g}'] = value
+            if edges:
+                entry['histogram'] = sketch.histogram(edges)
+            result[key] = entry
+        return {'edges': edges, 'groups': result}
+
+
+# -------------------------
+# Heavy hitters: Space-Saving
+# -------------------------
+class SpaceSaving:
+    """
+    Top-k aproximado en memoria constante (`capacity` claves). Cada conteo
+    sobreestima el real en a lo sumo `error` (y todos en a lo sumo
+    n / capacity). Se actualiza de a una clave y se combina con `merge`.
+
+    >>> sketch = SpaceSaving.from_epsilon(0.001)
+    >>> sketch.update('python')
+    >>> sketch.top(10)
+    """
+    def __init__(self, capacity=1000):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self.n = 0
+        # heap de (conteo, secuencia, clave) con borrado perezoso: las entradas viejas se descartan al sacarlas
+        self._heap = []
+        self._seq = itertools.count()
+
+    @classmethod
+    def from_epsilon(cls, epsilon):
+        return cls(int(math.ceil(1 / epsilon)))
+
+    @property
+    def floor(self):
+        # cota de error de cualquier clave (0 mientras no se haya llenado)
+        if len(self.counts) < self.capacity:
+            return 0
+        return self._min()[0]
+
+    def _min(self):
+        heap = self._heap
+        while self.counts.get(heap[0][2]) != heap[0][0]:
+            heapq.heappop(heap)
+        return heap[0][0], heap[0][2]
+
+    def _push(self, key):
+        heapq.heappush(self._heap, (self.counts[key], next(self._seq), key))
+        if len(self._heap) > 4 * self.capacity:
+            self._rebuild()
+
+    def _rebuild(self):
+        self._heap = [(count, next(self._seq), key) for key, count in self.counts.items()]
+        heapq.heapify(self._heap)
+
+    def update(self, key, weight=1):
+        self.n += weight
+        if key in self.counts:
+            self.counts[key] += weight
+        elif len(self.counts) < self.capacity:
+            self.counts[key] = weight
+            self.errors[key] = 0
+        else:
+            # la clave nueva hereda el conteo de la mínima (de ahí el error)
+            floor, evicted = self._min()
+            heapq.heappop(self._heap)
+            del self.counts[evicted], self.errors[evicted]
+            self.counts[key] = floor + weight
+            self.errors[key] = floor
+        self._push(key)
+
+    def merge(self, other: 'SpaceSaving'):
+        # a una clave ausente en un lado se le suma el piso de ese lado (Agarwal et al.)
+        floor, other_floor = self.floor, other.floor
+        counts, errors = {}, {}
+        for key in self.counts.keys() | other.counts.keys():
+            counts[key] = self.counts.get(key, floor) + other.counts.get(key, other_floor)
+            errors[key] = self.errors.get(key, floor) + other.errors.get(key, other_floor)
+        kept = heapq.nlargest(self.capacity, counts, key=counts.get)
+        self.counts = {key: counts[key] for key in kept}
+        self.errors = {key: errors[key] for key in kept}
+        self.n += other.n
+        self._rebuild()
+        return self
+
+    def top(self, n=10):
+        keys = sorted(self.counts, key=lambda key: (-self.counts[key], str(key)))[:n]
+        return [(key, self.counts[key], self.errors[key]) for key in keys]
+
+    def to_dict(self):
+        return {'capacity': self.capacity, 'n': self.n,
+                'items': [[key, self.counts[key], self.errors[key]] for key in self.counts]}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data['capacity'])
+        sketch.n = data['n']
+        for key, count, error in data['items']:
+            sketch.counts[key] = count
+            sketch.errors[key] = error
+        sketch._rebuild()
+        return sketch
+
+
+HEAVY_HITTER_SECTIONS = ('top_skills', 'most_wanted_jobs', 'top_companies')
+
+
+class HeavyHitters:
+    """
+    Un SpaceSaving por endpoint de ranking (skills, títulos, compañías),
+    para top-k en memoria constante sobre una entrada sin límite.
+
+    >>> heavy_hitters = HeavyHitters(epsilon=0.001).update_frame(df, skills)
+    >>> heavy_hitters.result('top_companies', n=10)
+    """
+    def __init__(self, epsilon=0.001):
+        self.epsilon = epsilon
+        self.sketches = {name: SpaceSaving.from_epsilon(epsilon) for name in HEAVY_HITTER_SECTIONS}
+
+    def update_posting(self, job_title, company, skills=()):
+        self.sketches['most_wanted_jobs'].update(job_title)
+        self.sketches['top_companies'].update(company)
+        for skill in skills:
+            self.sketches['top_skills'].update(skill)
+        return self
+
+    def update_frame(self, df: pd.DataFrame, skills: SkillsIndex = None):
+        # conteos exactos del chunk, sumados al sketch de mayor a menor
+        for name, column in (('most_wanted_jobs', 'job_title'), ('top_companies', 'company')):
+            for key, count in df[column].value_counts().items():
+                self.sketches[name].update(key, int(count))
+        skills = skills if skills is not None else SkillsIndex.from_series(df['skills'])
+        counts = skills.counts()
+        for i in np.argsort(-counts, kind='stable'):
+            if counts[i] == 0:
+                break
+            self.sketches['top_skills'].update(skills.names[i], int(counts[i]))
+        return self
+
+    def merge(self, other: 'HeavyHitters'):
+        for name, sketch in other.sketches.items():
+            self.sketches[name].merge(sketch)
+        return self
+
+    def result(self, name, n=10):
+        sketch = self.sketches[name]
+        return {
+            'approximate': True,
+            'epsilon': self.epsilon,
+            'total': sketch.n,
+            'max_error': sketch.floor,
+            'items': [{'key': key, 'count': count, 'error': error} for key, count, error in sketch.top(n)],
+        }
+
+    def to_dict(self):
+        return {'epsilon': self.epsilon, 'sketches': {name: s.to_dict() for name, s in self.sketches.items()}}
+
+    @classmethod
+    def from_dict(cls, data):
+        heavy_hitters = cls(data['epsilon'])
+        heavy_hitters.sketches = {name: SpaceSaving.from_dict(s) for name, s in data['sketches'].items()}
+        return heavy_hitters
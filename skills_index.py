@@ -0,0 +1,113 @@
+import ast
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+
+# la columna skills es una lista de Python serializada: "['spark', 'r', 'python']"
+def parse_skills(value):
+    if not isinstance(value, str):
+        return []
+    try:
+        parsed = ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        parsed = value.strip().strip('[]').split(',')
+    if isinstance(parsed, str):
+        parsed = [parsed]
+    skills = (str(skill).strip().strip('\'"').strip() for skill in parsed)
+    # sin repetidos dentro de la misma oferta, respetando el orden
+    return list(dict.fromkeys(skill for skill in skills if skill))
+
+
+class SkillsIndex:
+    """
+    Matriz dispersa (CSR) oferta x habilidad construida una sola vez.
+    Conteos y promedios por habilidad son productos matriz-vector.
+
+    >>> skills = SkillsIndex.from_series(df['skills'])
+    >>> skills.counts()                    # ofertas por habilidad
+    >>> skills.salary_means(df['salary'])  # salario promedio por habilidad
+    """
+    def __init__(self, names: np.ndarray, matrix: sparse.csr_matrix):
+        self.names = names
+        self.ids = {name: i for i, name in enumerate(names)}
+        self.matrix = matrix
+        # transpuesta precalculada para X.T @ v
+        self.matrix_t = matrix.T.tocsr()
+
+    @classmethod
+    def from_series(cls, skills: pd.Series):
+        # cada string distinto se parsea una sola vez
+        codes, uniques = pd.factorize(skills, use_na_sentinel=True)
+        ids = {}
+        indptr = [0]
+        indices = []
+        for value in uniques:
+            for skill in parse_skills(value):
+                indices.append(ids.setdefault(skill, len(ids)))
+            indptr.append(len(indices))
+        # fila vacía extra para los faltantes (código -1)
+        indptr.append(len(indices))
+        unique_matrix = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.int8), np.asarray(indices, dtype=np.int32), np.asarray(indptr)),
+            shape=(len(uniques) + 1, len(ids)),
+        )
+        codes = np.where(codes < 0, len(uniques), codes)
+        names = np.array(list(ids), dtype=object)
+        return cls(names, unique_matrix[codes])
+
+    def append(self, delta: 'SkillsIndex') -> 'SkillsIndex':
+        # índice con las filas de `delta` (armado solo con las nuevas) al final;
+        # las habilidades nuevas reciben ids a continuación de las existentes
+        ids = dict(self.ids)
+        columns = np.array([ids.setdefault(name, len(ids)) for name in delta.names], dtype=np.int32)
+        shape = (delta.n_rows, len(ids))
+        delta_matrix = sparse.csr_matrix((delta.matrix.data, columns[delta.matrix.indices], delta.matrix.indptr), shape=shape)
+        old_matrix = sparse.csr_matrix((self.matrix.data, self.matrix.indices, self.matrix.indptr),
+                                       shape=(self.n_rows, len(ids)))
+        names = np.array(list(ids), dtype=object)
+        return SkillsIndex(names, sparse.vstack([old_matrix, delta_matrix], format='csr'))
+
+    @property
+    def nbytes(self):
+        return sum(m.data.nbytes + m.indices.nbytes + m.indptr.nbytes for m in (self.matrix, self.matrix_t))
+
+    @property
+    def n_rows(self):
+        return self.matrix.shape[0]
+
+    def row_skills(self, row):
+        start, end = self.matrix.indptr[row], self.matrix.indptr[row + 1]
+        return self.names[self.matrix.indices[start:end]].tolist()
+
+    def _select(self, rows):
+        # rows: None (todas), máscara booleana o array de índices de fila
+        if rows is None:
+            return self.matrix_t, None
+        rows = np.asarray(rows)
+        if rows.dtype == bool:
+            return self.matrix_t, rows
+        return self.matrix[rows].T, None
+
+    def counts(self, rows=None) -> np.ndarray:
+        matrix_t, mask = self._select(rows)
+        weights = np.ones(matrix_t.shape[1], dtype=np.int64) if mask is None else mask.astype(np.int64)
+        return matrix_t @ weights
+
+    def salary_sums(self, salary, rows=None):
+        salary = np.asarray(salary, dtype=np.float64)
+        matrix_t, mask = self._select(rows)
+        if rows is not None and mask is None:
+            salary = salary[np.asarray(rows)]
+        valid = ~np.isnan(salary)
+        if mask is not None:
+            valid &= mask
+        sums = matrix_t @ np.where(valid, salary, 0.0)
+        counts = matrix_t @ valid.astype(np.int64)
+        return sums, counts
+
+    def salary_means(self, salary, rows=None) -> np.ndarray:
+        sums, counts = self.salary_sums(salary, rows)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
@@ -0,0 +1,131 @@
+import logging
+import os
+import re
+import stat
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from metrics import SNAPSHOT_BYTES, SNAPSHOT_EVICTIONS, SNAPSHOT_LOADS
+
+
+logger = logging.getLogger(__name__)
+
+# nombre de snapshot válido: sin separadores de ruta ni nombres ocultos
+SNAPSHOT_NAME = re.compile(r'[A-Za-z0-9_-][A-Za-z0-9_.-]*')
+
+
+class UnknownSnapshot(KeyError):
+    pass
+
+
+class SnapshotRegistry:
+    """
+    Snapshots del dataset (un CSV por snapshot en `directory`, el nombre es
+    el del archivo sin .csv) cargados a demanda con `load(path)`. Los
+    cargados se mantienen en orden LRU y se descartan los menos usados
+    cuando la suma de sus bytes (`sizeof(state)`) pasa `budget_bytes`.
+    Si varios requests piden a la vez un snapshot que no está cargado, lo
+    carga el primero y el resto espera ese mismo resultado.
+
+    >>> snapshots = SnapshotRegistry('snapshots/', 2 << 30, load_snapshot, dataset_bytes)
+    >>> snapshots.get('2024')        # DatasetState de snapshots/2024.csv
+    """
+    def __init__(self, directory, budget_bytes, load, sizeof):
+        self.directory = directory
+        self.budget_bytes = budget_bytes
+        self.load = load
+        self.sizeof = sizeof
+        self.lock = threading.Lock()
+        # nombre -> (estado, bytes, (mtime, tamaño) del CSV); el último es el usado más recientemente
+        self.loaded = OrderedDict()
+        # nombre -> Future de la carga en curso
+        self.loading = {}
+
+    def available(self):
+        try:
+            entries = os.scandir(self.directory)
+        except FileNotFoundError:
+            return []
+        with entries:
+            return sorted(entry.name[:-4] for entry in entries if entry.name.endswith('.csv') and entry.is_file())
+
+    def _stamp(self, name):
+        # el nombre no puede salir del directorio; solo se consulta ese archivo (sin listar el directorio)
+        if not SNAPSHOT_NAME.fullmatch(name):
+            raise UnknownSnapshot(name)
+        try:
+            info = os.stat(os.path.join(self.directory, name + '.csv'))
+        except (FileNotFoundError, NotADirectoryError):
+            raise UnknownSnapshot(name) from None
+        if not stat.S_ISREG(info.st_mode):
+            raise UnknownSnapshot(name)
+        return info.st_mtime_ns, info.st_size
+
+    @property
+    def used_bytes(self):
+        return sum(nbytes for _, nbytes, _ in self.loaded.values())
+
+    def get(self, name):
+        stamp = self._stamp(name)
+        with self.lock:
+            entry = self.loaded.get(name)
+            if entry is not None and entry[2] == stamp:
+                self.loaded.move_to_end(name)
+                return entry[0]
+            future = self.loading.get(name)
+            owner = future is None
+            if owner:
+                future = self.loading[name] = Future()
+        if not owner:
+            return future.result()
+
+        try:
+            state = self.load(os.path.join(self.directory, name + '.csv'))
+            nbytes = self.sizeof(state)
+        except BaseException as error:
+            with self.lock:
+                del self.loading[name]
+            future.set_exception(error)
+            raise
+        with self.lock:
+            del self.loading[name]
+            # si el CSV cambió, la versión anterior se reemplaza
+            self.loaded.pop(name, None)
+            self.loaded[name] = (state, nbytes, stamp)
+            self._evict()
+        SNAPSHOT_LOADS.inc(snapshot=name)
+        SNAPSHOT_BYTES.set(nbytes, snapshot=name)
+        future.set_result(state)
+        return state
+
+    def _evict(self):
+        # el recién cargado (último) se conserva aunque solo ya supere el presupuesto;
+        # los requests en curso sobre un snapshot descartado lo siguen usando hasta terminar
+        while self.used_bytes > self.budget_bytes and len(self.loaded) > 1:
+            name, (_, nbytes, _) = self.loaded.popitem(last=False)
+            logger.info('snapshot %s descartado (%d bytes) para respetar el presupuesto de memoria', name, nbytes)
+            SNAPSHOT_EVICTIONS.inc(snapshot=name)
+            SNAPSHOT_BYTES.set(0, snapshot=name)
+        if self.used_bytes > self.budget_bytes:
+            logger.warning('el snapshot cargado ocupa %d bytes, más que el presupuesto (%d)',
+                           self.used_bytes, self.budget_bytes)
+
+    def report(self):
+        with self.lock:
+            loaded = {name: (state, nbytes) for name, (state, nbytes, _) in self.loaded.items()}
+            loading = set(self.loading)
+        snapshots = {}
+        for name in self.available():
+            if name in loaded:
+                state, nbytes = loaded[name]
+                snapshots[name] = {'status': 'loaded', 'version': state.version, 'rows': state.rows, 'bytes': nbytes}
+            else:
+                snapshots[name] = {'status': 'loading' if name in loading else 'available'}
+        return {
+            'budget_bytes': self.budget_bytes,
+            'used_bytes': sum(nbytes for _, nbytes in loaded.values()),
+            # de menos a más usado recientemente (el primero es el próximo a descartar)
+            'lru': list(loaded),
+            'snapshots': snapshots,
+        }
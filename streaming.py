@@ -0,0 +1,133 @@
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from aggregates import Ranking
+from sketches import HeavyHitters, SalarySketches
+from skills_index import SkillsIndex
+
+
+CHUNK_SIZE = 100_000
+
+
+class PartialAggregates:
+    """
+    Agregados parciales que se pueden combinar (conteos, sumas y cantidades
+    de salario por clave). Cada chunk del CSV se pliega acá y después se
+    descarta, así la memoria depende de la cantidad de claves y no de filas.
+
+    Con `exact=False` los conteos de skills, títulos y compañías salen solo
+    de los sketches de heavy hitters (memoria constante, con cota de error).
+
+    >>> partial = stream_aggregates(DATA_PATH, clean_frame)
+    >>> partial.results()['top_skills']
+    """
+    def __init__(self, salary_column='salary', exact=True, epsilon=0.001):
+        self.salary_column = salary_column
+        self.exact = exact
+        self.rows = 0
+        self.skill_counts = Counter()
+        self.skill_salary_sum = Counter()
+        self.skill_salary_count = Counter()
+        self.level_salary_sum = Counter()
+        self.level_salary_count = Counter()
+        self.title_counts = Counter()
+        self.company_counts = Counter()
+        self.location_counts = Counter()
+        self.salary_sketches = SalarySketches(salary_column=salary_column)
+        self.heavy_hitters = HeavyHitters(epsilon)
+
+    def update(self, chunk: pd.DataFrame, skills: SkillsIndex = None):
+        self.rows += len(chunk)
+        salary = chunk[self.salary_column].to_numpy(dtype=np.float64)
+
+        skills = skills if skills is not None else SkillsIndex.from_series(chunk['skills'])
+        sums, counts = skills.salary_sums(salary)
+        if self.exact:
+            self.skill_counts.update(dict(zip(skills.names, skills.counts().tolist())))
+        self.skill_salary_sum.update(dict(zip(skills.names, sums.tolist())))
+        self.skill_salary_count.update(dict(zip(skills.names, counts.tolist())))
+
+        # el salario puede venir en float32: acumular en float64
+        valid = ~np.isnan(salary)
+        by_level = pd.Series(salary[valid]).groupby(chunk['seniority_level'].to_numpy()[valid]).agg(['sum', 'count'])
+        self.level_salary_sum.update(by_level['sum'].to_dict())
+        self.level_salary_count.update(by_level['count'].to_dict())
+
+        if self.exact:
+            self.title_counts.update(chunk['job_title'].value_counts().to_dict())
+            self.company_counts.update(chunk['company'].value_counts().to_dict())
+        self.location_counts.update(chunk['location'].dropna().value_counts().to_dict())
+        self.salary_sketches.update_frame(chunk, skills)
+        self.heavy_hitters.update_frame(chunk, skills)
+        return self
+
+    def merge(self, other: 'PartialAggregates'):
+        self.rows += other.rows
+        for name in ('skill_counts', 'skill_salary_sum', 'skill_salary_count', 'level_salary_sum',
+                     'level_salary_count', 'title_counts', 'company_counts', 'location_counts'):
+            getattr(self, name).update(getattr(other, name))
+        self.salary_sketches.merge(other.salary_sketches)
+        self.heavy_hitters.merge(other.heavy_hitters)
+        return self
+
+    def copy(self) -> 'PartialAggregates':
+        return PartialAggregates(self.salary_column, self.exact, self.heavy_hitters.epsilon).merge(self)
+
+    # conteos por endpoint: exactos, o los que retiene cada sketch de heavy hitters
+    def counts(self, name):
+        if self.exact:
+            return {'top_skills': self.skill_counts, 'most_wanted_jobs': self.title_counts,
+                    'top_companies': self.company_counts}[name]
+        return Counter(self.heavy_hitters.sketches[name].counts)
+
+    # mismos resultados (y formato) que aggregates.compute_aggregates
+    def results(self):
+        skill_means = {
+            skill: self.skill_salary_sum[skill] / count
+            for skill, count in self.skill_salary_count.items() if count > 0
+        }
+        return {
+            'top_skills': [(skill, count) for skill, count in self.counts('top_skills').most_common(10) if count > 0],
+            'avg_salary_by_level': {
+                level: self.level_salary_sum[level] / count
+                for level, count in self.level_salary_count.items() if count > 0
+            },
+            'most_wanted_jobs': dict(self.counts('most_wanted_jobs').most_common(10)),
+            'top_companies': dict(self.counts('top_companies').most_common(10)),
+            'avg_salary_by_technology': dict(Counter(skill_means).most_common(10)),
+            'jobs_by_location': dict(self.location_counts.most_common(10)),
+        }
+
+
+    # rankings paginables a partir de los contadores (ver aggregates.Ranking)
+    def rankings(self):
+        def counts(counter, **kwargs):
+            values = np.fromiter(counter.values(), dtype=np.float64, count=len(counter))
+            return Ranking(list(counter), values, values, integer=True, **kwargs)
+
+        def means(sums, totals, **kwargs):
+            keys = list(totals)
+            support = np.array([totals[k] for k in keys], dtype=np.float64)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                values = np.array([sums[k] for k in keys], dtype=np.float64) / support
+            return Ranking(keys, values, support, **kwargs)
+
+        return {
+            'top_skills': counts(self.counts('top_skills'), pairs=True),
+            'avg_salary_by_level': means(self.level_salary_sum, self.level_salary_count, default_n=None),
+            'most_wanted_jobs': counts(self.counts('most_wanted_jobs')),
+            'top_companies': counts(self.counts('top_companies')),
+            'avg_salary_by_technology': means(self.skill_salary_sum, self.skill_salary_count),
+            'jobs_by_location': counts(self.location_counts),
+        }
+
+def stream_aggregates(path, clean, chunksize=CHUNK_SIZE, salary_column='salary', exact=True,
+                      epsilon=0.001) -> PartialAggregates:
+    # lee el CSV en chunks acotados; `clean` se aplica a cada chunk (la limpieza de
+    # job_analyzer, o FeatureEngineer(chunk).engineer_all() con salary_column='mean_salary')
+    partial = PartialAggregates(salary_column, exact, epsilon)
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        partial.update(clean(chunk))
+    return partial
@@ -0,0 +1,42 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bitmap_index import BitmapIndex, FILTER_COLUMNS
+from datasets.salary_parser import parse_salary
+
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), '..', 'datasets', 'data_science_job_posts_2025.csv')
+
+
+@pytest.fixture(scope='module')
+def frame():
+    df = pd.read_csv(DATA_PATH)
+    df['salary'] = parse_salary(df['salary'])[0]['mean_salary']
+    return df
+
+
+@pytest.mark.parametrize('split', [1, 300, 900])
+def test_append_equals_rebuild(frame, split):
+    full = BitmapIndex.from_frame(frame)
+    appended = BitmapIndex.from_frame(frame.iloc[:split]).append(frame.iloc[split:])
+
+    assert appended.n_rows == full.n_rows
+    np.testing.assert_array_equal(appended.salary_order, full.salary_order)
+    for col in FILTER_COLUMNS:
+        old, new = full.columns[col], appended.columns[col]
+        # los valores nuevos van al final en ambos casos (orden de aparición)
+        assert new.values.tolist() == old.values.tolist()
+        np.testing.assert_array_equal(new.codes, old.codes)
+        np.testing.assert_array_equal(new.order, old.order)
+        np.testing.assert_array_equal(new.offsets, old.offsets)
+        assert new.dense.keys() == old.dense.keys()
+        for code in old.dense:
+            np.testing.assert_array_equal(new.dense[code], old.dense[code])
+
+    filters = {'seniority_level': ['senior'], 'company': ['company_134', 'company_421']}
+    for kwargs in ({'filters': filters}, {'filters': {}, 'min_salary': 100000},
+                   {'filters': {'seniority_level': ['senior']}, 'max_salary': 80000}):
+        np.testing.assert_array_equal(appended.select(**kwargs), full.select(**kwargs))
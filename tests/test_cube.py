@@ -0,0 +1,54 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from datasets.cube import CUBE_COLUMNS, MISSING, OLAPCube
+from datasets.feature_engineering import FeatureEngineer
+
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), '..', 'datasets', 'data_science_job_posts_2025.csv')
+
+
+@pytest.fixture(scope='module')
+def features():
+    df = pd.read_csv(DATA_PATH)
+    return FeatureEngineer(df, copy=False).select(CUBE_COLUMNS)
+
+
+def by_key(result):
+    return {tuple(sorted(cell.pop('key').items())): cell for cell in result}
+
+
+def test_query_matches_groupby(features):
+    cube = OLAPCube.from_frame(features)
+    subset = features[features['industry'].isin(['Retail', 'Technology'])]
+    result = by_key(cube.query(group_by=['location', 'seniority_level'], filters={'industry': ['Retail', 'Technology']}))
+
+    grouped = subset.fillna({'location': MISSING, 'seniority_level': MISSING}) \
+        .groupby(['location', 'seniority_level'])['mean_salary']
+    expected = pd.DataFrame({'rows': grouped.size(), 'count': grouped.count(), 'mean': grouped.mean(),
+                             'min': grouped.min(), 'max': grouped.max(), 'std': grouped.std(ddof=0)})
+    assert len(result) == len(expected)
+    for (location, level), row in expected.iterrows():
+        cell = result[(('location', location), ('seniority_level', level))]
+        assert (cell['rows'], cell['count']) == (row['rows'], row['count'])
+        for stat in ('mean', 'min', 'max', 'std'):
+            if np.isnan(row[stat]):
+                assert cell[stat] is None
+            else:
+                assert cell[stat] == pytest.approx(row[stat])
+
+
+def test_chunks_and_merge_equal_one_build(features):
+    whole = OLAPCube.from_frame(features)
+    chunked = OLAPCube.from_frames(features.iloc[start:start + 100] for start in range(0, len(features), 100))
+    merged = OLAPCube.from_frame(features.iloc[:500]).merge(OLAPCube.from_frame(features.iloc[500:]))
+    for group_by, measure in ((['location'], 'mean_salary'), (['ownership', 'status'], 'revenue'), ([], 'company_size')):
+        expected = by_key(whole.query(group_by=group_by, measure=measure))
+        for cube in (chunked, merged):
+            result = by_key(cube.query(group_by=group_by, measure=measure))
+            assert result.keys() == expected.keys()
+            for key, cell in expected.items():
+                assert result[key] == pytest.approx(cell)
@@ -0,0 +1,59 @@
+import functools
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import columnar_cache
+
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+DATA_PATH = os.path.join(ROOT, 'datasets', 'data_science_job_posts_2025.csv')
+
+
+@pytest.fixture(scope='module')
+def job_analyzer():
+    # la app carga el dataset incluido al importarse (DATA_PATH relativo a la raíz del repo)
+    with pytest.MonkeyPatch.context() as patch:
+        patch.chdir(ROOT)
+        import job_analyzer
+    return job_analyzer
+
+
+@pytest.fixture
+def load(job_analyzer, tmp_path, monkeypatch):
+    # caché en un directorio temporal: cada carga arma el frame desde el CSV
+    monkeypatch.setattr(job_analyzer, 'load_cached_frame',
+                        functools.partial(columnar_cache.load_cached_frame, cache_dir=str(tmp_path / 'cache')))
+    return lambda path, version: job_analyzer.load_dataset(str(path), version)
+
+
+def test_ingest_equals_full_reload(job_analyzer, load, tmp_path):
+    raw = pd.read_csv(DATA_PATH)
+    split = 900
+    # una fila por línea en el CSV incluido: las primeras `split` filas, tal cual
+    with open(DATA_PATH, 'rb') as fh:
+        lines = fh.readlines()
+    head = tmp_path / 'head.csv'
+    head.write_bytes(b''.join(lines[:split + 1]))
+
+    dumps = job_analyzer.app.json.dumps
+    ingested = load(head, 'v1').append(raw.iloc[split:].reset_index(drop=True), 'v2', job_analyzer.clean_frame, dumps)
+    reloaded = load(DATA_PATH, 'v2')
+
+    assert ingested.rows == reloaded.rows == len(raw)
+    assert ingested.aggregates.payloads == reloaded.aggregates.payloads
+    for name, ranking in reloaded.aggregates.rankings.items():
+        assert ingested.aggregates.rankings[name].page(n=None) == ranking.page(n=None)
+    pd.testing.assert_frame_equal(ingested.df.reset_index(drop=True), reloaded.df.reset_index(drop=True),
+                                  check_dtype=False, check_categorical=False)
+    np.testing.assert_array_equal(ingested.bitmaps.select({'seniority_level': ['senior']}, min_salary=100000),
+                                  reloaded.bitmaps.select({'seniority_level': ['senior']}, min_salary=100000))
+    assert ingested.cooccurrence.query('python', n=5) == reloaded.cooccurrence.query('python', n=5)
+    assert ingested.trends.series('skill', ('python', 'sql')) == reloaded.trends.series('skill', ('python', 'sql'))
+    for group_by in (['location'], ['ownership', 'seniority_level']):
+        assert (json.dumps(ingested.cube.query(group_by=group_by), sort_keys=True)
+                == json.dumps(reloaded.cube.query(group_by=group_by), sort_keys=True))
+    # los sketches de cuantiles (KLL) son aproximados y dependen del orden de inserción: no se comparan
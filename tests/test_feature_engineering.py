@@ -0,0 +1,46 @@
+import pandas as pd
+import pytest
+
+from datasets.feature_engineering import FeatureEngineer
+
+
+@pytest.mark.parametrize('location, continent', [
+    ('Seoul, South Korea', 'Asia'),
+    ('Auckland, New Zealand', 'Other'),
+    ('Buenos Aires Metropolitan Area', 'Other'),
+    ('Warsaw, Poland', 'Europe'),
+    ('Johannesburg, South Africa', 'Other'),
+    ('Somewhere, Atlantis', 'Other'),
+])
+def test_every_gazetteer_country_has_a_continent(location, continent):
+    df = pd.DataFrame({'location': [location], 'headquarter': ['Seoul, KR']})
+    fe = FeatureEngineer(df)
+    fe.engineer_location()
+    assert fe.df['location'].tolist() == [continent]
+
+
+def test_lookup_tables_are_checked_when_built():
+    class Broken(FeatureEngineer):
+        def _init_ambiguous_places(self):
+            return {'CT': ['United States', 'Atlantis']}
+
+    with pytest.raises(ValueError, match='Atlantis'):
+        Broken(pd.DataFrame({'location': []}))
+
+
+def test_lenient_mode_leaves_unresolved_locations_missing(monkeypatch):
+    # una ubicación sin continente no tira abajo el armado del cubo
+    original = FeatureEngineer.replace_location_with_country
+    monkeypatch.setattr(FeatureEngineer, 'replace_location_with_country',
+                        lambda self, location: 'Atlantis' if location == 'Atlantis' else original(self, location))
+    monkeypatch.setattr(FeatureEngineer, '_location_memo', {})
+    df = pd.DataFrame({'location': ['Atlantis', 'Seoul, South Korea'], 'headquarter': ['Paris', 'Atlantis'],
+                       'post_date': ['a day ago', '2 days ago']})
+    fe = FeatureEngineer(df, copy=False, strict=False)
+    out = fe.select(['location', 'headquarter'])
+    assert out['location'].tolist() == [None, 'Asia']
+    assert out['headquarter'].tolist() == ['Europe', None]
+    assert fe.parse_errors['location'].tolist() == [0]
+    assert fe.parse_errors['headquarter'].tolist() == [1]
+    with pytest.raises(ValueError, match='Atlantis'):
+        FeatureEngineer(df, copy=False).select(['location'])
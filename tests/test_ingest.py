@@ -0,0 +1,49 @@
+import pytest
+
+from aggregates import dataset_digest, dataset_version
+from ingest import TailIngester
+
+
+HEADER = b'company,salary\n'
+
+
+def make_ingester(path, states):
+    def prepare(raw, version):
+        if (raw['salary'] == 'boom').any():
+            raise ValueError('no se pudo limpiar el lote')
+        return (version, len(raw))
+
+    digest, size = dataset_digest(path)
+    return TailIngester(str(path), digest, size, prepare, states.append)
+
+
+def test_rejected_append_leaves_file_and_state_unchanged(tmp_path):
+    path = tmp_path / 'data.csv'
+    path.write_bytes(HEADER + b'a,1\n')
+    states = []
+    ingester = make_ingester(path, states)
+
+    with pytest.raises(ValueError):
+        ingester.append(HEADER + b'b,2\nc,boom\n')
+    assert path.read_bytes() == HEADER + b'a,1\n'
+    assert states == []
+    assert ingester.poll() == 0
+
+    # el siguiente lote válido se ingiere normalmente
+    assert ingester.append(HEADER + b'd,4') == 1
+    assert path.read_bytes() == HEADER + b'a,1\nd,4\n'
+    assert states == [(dataset_version(path), 1)]
+
+
+def test_append_takes_pending_rows_and_missing_newline(tmp_path):
+    path = tmp_path / 'data.csv'
+    path.write_bytes(HEADER + b'a,1\n')
+    states = []
+    ingester = make_ingester(path, states)
+    # otro proceso agregó una fila sin salto de línea final
+    with open(path, 'ab') as fh:
+        fh.write(b'b,2')
+
+    assert ingester.append(HEADER + b'c,3\n') == 2
+    assert path.read_bytes() == HEADER + b'a,1\nb,2\nc,3\n'
+    assert states == [(dataset_version(path), 2)]
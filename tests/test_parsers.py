@@ -0,0 +1,143 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from datasets.company_info_parser import parse_company_info
+from datasets.feature_engineering import FeatureEngineer
+from datasets.post_date_parser import parse_post_date
+from datasets.salary_parser import parse_salary
+
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), '..', 'datasets', 'data_science_job_posts_2025.csv')
+
+
+@pytest.fixture(scope='module')
+def df():
+    return pd.read_csv(DATA_PATH)
+
+
+# -------------------------
+# Versiones originales, fila por fila (referencia)
+# -------------------------
+def reference_salary(salary_str):
+    if pd.isna(salary_str):
+        return None
+    if ' - ' in str(salary_str):
+        low, high = str(salary_str).replace('€', '').replace(',', '').split(' - ')
+        return (float(low) + float(high)) / 2
+    return float(str(salary_str).replace('€', '').replace(',', ''))
+
+
+def reference_post_date(el):
+    for word, num in {'zero': '0', 'a ': '1 ', 'one': '1', 'two': '2', 'three': '3', 'four': '4', 'five': '5',
+                      'six': '6', 'seven': '7', 'eight': '8', 'nine': '9', 'ten': '10', 'eleven': '11',
+                      'twelve': '12'}.items():
+        el = el.replace(word, num)
+    number = el.split()[0]
+    if 'hour' in el.lower():
+        return 0
+    if 'day' in el.lower():
+        return int(number)
+    if 'month' in el.lower():
+        return int(number) * 30
+    if 'year' in el.lower():
+        return int(number) * 365
+    raise ValueError(f'Unexpected format in post_date: {el}')
+
+
+def reference_company_info(df):
+    df = df[['ownership', 'company_size', 'revenue']].copy()
+    ownerships = df['ownership'].dropna().unique()
+    mask = df['revenue'].isin(ownerships)
+    df.loc[mask, 'ownership'] = df.loc[mask, 'revenue']
+    mask = df['company_size'].isin(ownerships)
+    df.loc[mask, 'ownership'] = df.loc[mask, 'company_size']
+    mask = df['company_size'].str.contains('€', na=False)
+    df.loc[mask, 'revenue'] = df.loc[mask, 'company_size']
+    mask = df['company_size'].str.contains('€', na=False) | df['company_size'].isin(ownerships)
+    df.loc[mask, 'company_size'] = None
+    mask = df['revenue'].astype(str).str.contains('€', na=False)
+    df.loc[~mask, 'revenue'] = None
+
+    def revenue(value):
+        if isinstance(value, str):
+            try:
+                return float(value.replace('€', '').replace('B', 'e9').replace('M', 'e6').replace(',', ''))
+            except ValueError:
+                return None
+        return None
+
+    df['revenue'] = df['revenue'].apply(revenue)
+    df['company_size'] = df['company_size'].apply(lambda x: int(''.join(x.split(','))) if isinstance(x, str) else None)
+    return df
+
+
+def reference_country(table, location):
+    # recorre las palabras y se queda con la primera que esté en la tabla
+    if '(' in str(location):
+        location = location.split('(')[0].strip()
+    if pd.isna(location):
+        return None
+    found = False
+    for item in location.split():
+        if item in table:
+            found = True
+            break
+    if location in table:
+        return table[location]
+    if 'multi-location' in location.lower():
+        return 'multi-location'
+    return table[item] if found else 'Unrecognized'
+
+
+# -------------------------
+# Paridad sobre el CSV incluido
+# -------------------------
+def test_salary_matches_row_by_row_parser(df):
+    salaries, unparsed = parse_salary(df['salary'])
+    expected = df['salary'].map(reference_salary).astype(np.float64)
+    np.testing.assert_array_equal(salaries['mean_salary'].to_numpy(), expected.to_numpy())
+    assert not unparsed.any()
+
+
+def test_post_date_matches_row_by_row_parser(df):
+    parsed, unparsed = parse_post_date(df['post_date'])
+    expected = df['post_date'].map(reference_post_date)
+    assert parsed['days_ago'].tolist() == expected.tolist()
+    assert not unparsed.any()
+
+
+def test_company_info_matches_row_by_row_steps(df):
+    info, _, _ = parse_company_info(df['ownership'], df['company_size'], df['revenue'],
+                                    df['ownership'].dropna().unique())
+    expected = reference_company_info(df)
+    pd.testing.assert_series_equal(info['ownership'], expected['ownership'])
+    np.testing.assert_array_equal(info['company_size'].to_numpy(), expected['company_size'].astype(np.float64))
+    # única diferencia buscada: el original no entendía el sufijo T (billones) y dejaba NaN
+    revenue = expected['revenue'].astype(np.float64).to_numpy()
+    differs = ~np.isclose(info['revenue'].to_numpy(), revenue, equal_nan=True)
+    assert differs.any()
+    assert df['revenue'][differs].str.endswith('T').all()
+    assert np.isnan(revenue[differs]).all()
+
+
+def test_gazetteer_matches_word_lookup_where_it_recognized_the_place(df):
+    fe = FeatureEngineer(df)
+    # tabla original: CT y NB figuraban con su último país (Cataluña / Brabante)
+    table = {**fe.state_city_to_country, 'CT': 'Spain', 'NB': 'Netherlands'}
+    location = df['location'].map(fe.extract_location)
+    onsite = location.isin(['On-site', 'Hybrid'])
+    location[onsite] = df.loc[onsite, 'headquarter']
+    values = set(location.dropna()) | set(df['headquarter'].map(fe.extract_headquarter).dropna())
+
+    improved = {}
+    for value in values:
+        country, expected = fe.replace_location_with_country(value), reference_country(table, value)
+        if country != expected:
+            improved[value] = (expected, country)
+    # el gazetteer solo cambia lo que antes no se reconocía y los códigos ambiguos solos
+    assert all(expected == 'Unrecognized' or value in ('CT', 'NB') for value, (expected, _) in improved.items())
+    assert improved['San Francisco Bay Area'] == ('Unrecognized', 'United States')
+    assert improved['CT'] == ('Spain', 'United States')
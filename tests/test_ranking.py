@@ -0,0 +1,82 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from aggregates import MaterializedAggregates, Ranking
+from bitmap_index import BitmapIndex
+from datasets.salary_parser import parse_salary
+from skills_index import SkillsIndex
+from streaming import PartialAggregates
+
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), '..', 'datasets', 'data_science_job_posts_2025.csv')
+
+
+def reference(keys, values, order):
+    # orden total de referencia: valor (desc o asc) y clave ascendente
+    sign = 1 if order == 'asc' else -1
+    return sorted(keys, key=lambda k: (sign * values[keys.index(k)], k))
+
+
+def test_pages_cover_every_key_once_with_ties():
+    rng = np.random.default_rng(0)
+    # muchos empates en los cortes de página
+    values = rng.integers(1, 6, size=500)
+    keys = [f'key_{i}' for i in range(500)]
+    ranking = Ranking(keys, values, values, integer=True)
+    for order in ('desc', 'asc'):
+        seen = []
+        for offset in range(0, 500, 50):
+            seen.extend(ranking.page(n=50, offset=offset, order=order))
+        assert seen == reference(keys, list(values), order)
+    # la respuesta por defecto es la primera página
+    assert list(ranking.default()) == reference(keys, list(values), 'desc')[:10]
+
+
+def test_min_count_filters_before_paging():
+    ranking = Ranking(['a', 'b', 'c'], [3, 2, 1], [3, 2, 1], pairs=True, integer=True)
+    assert ranking.page(n=10, min_count=2) == [('a', 3), ('b', 2)]
+    assert ranking.page(n=1, offset=1, order='asc', min_count=2) == [('a', 3)]
+
+
+@pytest.fixture(scope='module')
+def frame():
+    df = pd.read_csv(DATA_PATH)
+    df['salary'] = parse_salary(df['salary'])[0]['mean_salary']
+    return df
+
+
+@pytest.fixture(scope='module')
+def full(frame):
+    skills = SkillsIndex.from_series(frame['skills'])
+    return MaterializedAggregates.build(frame, skills, 'v', json.dumps, BitmapIndex.from_frame(frame))
+
+
+@pytest.fixture(scope='module')
+def streamed(frame):
+    partial = PartialAggregates()
+    for start in range(0, len(frame), 100):
+        partial.update(frame.iloc[start:start + 100])
+    return MaterializedAggregates.from_results(partial.results(), 'v', json.dumps, partial.rankings())
+
+
+def test_default_n_offset_and_streaming_agree_on_ties(full, streamed):
+    for name in ('top_skills', 'most_wanted_jobs', 'top_companies', 'jobs_by_location', 'avg_salary_by_technology'):
+        ranking = full.rankings[name]
+        # por defecto == ?n=10, en modo completo y en streaming
+        assert full.payloads[name] == streamed.payloads[name]
+        assert json.loads(full.payloads[name]) == json.loads(json.dumps(ranking.page(n=10)))
+        for order in ('desc', 'asc'):
+            whole = ranking.page(n=None, order=order)
+            pages = []
+            for offset in range(0, len(whole), 7):
+                page = ranking.page(n=7, offset=offset, order=order)
+                assert page == streamed.rankings[name].page(n=7, offset=offset, order=order)
+                pages.extend(page)
+            assert pages == list(whole)
+    # top_companies tiene muchas compañías empatadas en el corte del top 10
+    counts = list(full.rankings['top_companies'].page(n=None).values())
+    assert counts[9] == counts[10]
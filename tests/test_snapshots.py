@@ -0,0 +1,24 @@
+import pytest
+
+from snapshots import SnapshotRegistry, UnknownSnapshot
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    (tmp_path / '2024.csv').write_text('company\na\n')
+    (tmp_path / 'dir.csv').mkdir()
+    (tmp_path.parent / 'outside.csv').write_text('company\nb\n')
+    registry = SnapshotRegistry(str(tmp_path), 1 << 20, lambda path: open(path).read(), len)
+    # get no lista el directorio en cada request
+    monkeypatch.setattr(registry, 'available', lambda: pytest.fail('available() en el camino del request'))
+    return registry
+
+
+def test_get_stats_only_the_requested_snapshot(registry):
+    assert registry.get('2024') == 'company\na\n'
+
+
+@pytest.mark.parametrize('name', ['nope', '../outside', '.hidden', 'dir', 'a/b', ''])
+def test_unknown_or_unsafe_names_are_rejected(registry, name):
+    with pytest.raises(UnknownSnapshot):
+        registry.get(name)
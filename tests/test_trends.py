@@ -0,0 +1,66 @@
+import datetime
+import os
+
+import numpy as np
+import pandas as pd
+
+from bitmap_index import BitmapIndex
+from datasets.post_date_parser import parse_post_date
+from datasets.salary_parser import parse_salary
+from skills_index import SkillsIndex
+from trends import TrendIndex
+
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), '..', 'datasets', 'data_science_job_posts_2025.csv')
+
+
+def make_trends(days_ago, reference_date=None):
+    df = pd.DataFrame({
+        'company': [f'company_{i % 3}' for i in range(len(days_ago))],
+        'salary': np.arange(len(days_ago), dtype=np.float64) * 1000,
+        'skills': ["['python', 'sql']"] * len(days_ago),
+    })
+    skills = SkillsIndex.from_series(df['skills'])
+    bitmaps = BitmapIndex.from_frame(df, columns=('company',))
+    return TrendIndex.from_index(days_ago, df['salary'], skills, bitmaps,
+                                 dimensions=('skill', 'company'), reference_date=reference_date)
+
+
+def test_oldest_bucket_label_ends_at_the_oldest_day():
+    # max_day = 360: el bucket mensual más viejo solo tiene el día 360
+    trends = make_trends([0, 5, 359, 360], reference_date=datetime.date(2025, 1, 31))
+    buckets = trends.buckets('month')
+    assert buckets[0]['days_ago'] == [360, 360]
+    assert buckets[0]['from'] == buckets[0]['to'] == (datetime.date(2025, 1, 31) - datetime.timedelta(days=360)).isoformat()
+    assert buckets[1]['days_ago'] == [359, 330]
+    assert buckets[-1]['days_ago'] == [29, 0]
+    series = trends.series('skill', ('python',), granularity='month', window=1)
+    assert len(series['buckets']) == len(trends._bucketed(trends.totals[0], 'month'))
+    assert trends._bucketed(trends.totals[0], 'month')[0] == 1
+
+
+def test_append_equals_rebuild():
+    df = pd.read_csv(DATA_PATH)
+    df['salary'] = parse_salary(df['salary'])[0]['mean_salary']
+    df['post_date'] = parse_post_date(df['post_date'])[0]['days_ago']
+    split = 700
+    head, tail = df.iloc[:split], df.iloc[split:]
+
+    full_skills = SkillsIndex.from_series(df['skills'])
+    full = TrendIndex.from_index(df['post_date'], df['salary'], full_skills, BitmapIndex.from_frame(df))
+    skills = SkillsIndex.from_series(head['skills'])
+    bitmaps = BitmapIndex.from_frame(head)
+    trends = TrendIndex.from_index(head['post_date'], head['salary'], skills, bitmaps)
+    skills = skills.append(SkillsIndex.from_series(tail['skills']))
+    appended = trends.append(tail['post_date'], tail['salary'], skills, bitmaps.append(tail))
+
+    assert appended.max_day == full.max_day
+    for total, expected in zip(appended.totals, full.totals):
+        np.testing.assert_allclose(total, expected)
+    for dim in full.names:
+        # las claves nuevas van al final: se comparan por nombre
+        order = [appended.ids[dim][name] for name in full.names[dim]]
+        for matrices, expected in ((appended.counts, full.counts), (appended.salary_sums, full.salary_sums)):
+            np.testing.assert_allclose(matrices[dim][:, order].toarray(), expected[dim].toarray())
+    assert appended.series('skill', ('python', 'sql'), granularity='week') == full.series('skill', ('python', 'sql'), granularity='week')
+    assert appended.movers('company', granularity='month') == full.movers('company', granularity='month')
@@ -0,0 +1,277 @@
+import datetime
+import functools
+
+import numpy as np
+from scipy import sparse
+
+from bitmap_index import BitmapIndex
+from skills_index import SkillsIndex
+
+
+TREND_DIMENSIONS = ('skill', 'job_title', 'company', 'location', 'industry', 'seniority_level')
+GRANULARITIES = {'day': 1, 'week': 7, 'month': 30}
+# mismo horizonte que FeatureEngineer.engineer_post_date: las ofertas más viejas no entran
+MAX_DAYS = 360
+
+
+def _number(value):
+    return None if np.isnan(value) else float(value)
+
+
+class TrendIndex:
+    """
+    Conteos y sumas de salario por día de publicación x clave (habilidad,
+    compañía, título, ...) armados una sola vez desde post_date (días atrás,
+    ya convertido de "17 days ago" por clean_frame), como matrices dispersas
+    de MAX_DAYS + 1 filas. Las series por
+    semana o mes, las ventanas móviles y el crecimiento son sumas sobre
+    rangos de días: nunca se vuelve a agrupar el DataFrame por request.
+
+    Con `reference_date` (la fecha del scrape) cada bucket lleva además sus
+    fechas de inicio y fin.
+
+    >>> trends = TrendIndex.from_index(df['post_date'], df['salary'], skills, bitmaps)
+    >>> trends.series('skill', ('python', 'spark'), granularity='week', window=4)
+    >>> trends.movers('skill', granularity='month', window=1)
+    """
+    def __init__(self, names: dict, counts: dict, salary_sums: dict, salary_counts: dict, totals, n_rows,
+                 reference_date=None):
+        self.names = names
+        self.ids = {dim: {name: i for i, name in enumerate(values)} for dim, values in names.items()}
+        self.counts = counts
+        self.salary_sums = salary_sums
+        self.salary_counts = salary_counts
+        # (ofertas, suma de salarios, salarios) por día, sobre todas las ofertas con fecha
+        self.totals = totals
+        self.n_rows = n_rows
+        self.reference_date = reference_date
+        # día más viejo con alguna oferta: define cuántos buckets hay
+        self.max_day = int(np.flatnonzero(totals[0])[-1]) if totals[0].any() else 0
+        self.series = functools.lru_cache(maxsize=256)(self._series)
+        self.movers = functools.lru_cache(maxsize=256)(self._movers)
+        self.velocity = functools.lru_cache(maxsize=256)(self._velocity)
+
+    @classmethod
+    def from_index(cls, days_ago, salary, skills: SkillsIndex, bitmaps: BitmapIndex,
+                   start=0, shift=0, dimensions=TREND_DIMENSIONS, reference_date=None):
+        # `days_ago` (post_date ya convertido por clean_frame, -1 si no se pudo leer) y `salary` son
+        # las filas start... de `skills` y `bitmaps` (start > 0 al ingerir); `shift` se suma a los días
+        # (filas scrapeadas `shift` días después de la fecha de referencia)
+        days = np.asarray(days_ago, dtype=np.int64) + shift
+        rows = np.flatnonzero((days >= shift) & (days <= MAX_DAYS))
+        days = days[rows]
+        salary = np.asarray(salary, dtype=np.float64)[rows]
+        valid = ~np.isnan(salary)
+        weights = (np.ones(len(rows)), np.where(valid, salary, 0.0), valid.astype(np.float64))
+        shape = (MAX_DAYS + 1,)
+        totals = tuple(np.bincount(days, weights=w, minlength=MAX_DAYS + 1) for w in weights)
+
+        names, matrices = {}, {}
+        for dim in dimensions:
+            if dim == 'skill':
+                names[dim] = skills.names
+                matrix = skills.matrix[rows + start]
+                # día x oferta (ponderada) @ oferta x habilidad
+                matrices[dim] = [
+                    (sparse.csr_matrix((w, (days, np.arange(len(rows)))), shape=shape + (len(rows),)) @ matrix).tocsr()
+                    for w in weights
+                ]
+            else:
+                index = bitmaps.columns[dim]
+                names[dim] = index.values
+                codes = index.codes[rows + start]
+                keep = codes >= 0
+                matrices[dim] = [
+                    sparse.csr_matrix((w[keep], (days[keep], codes[keep])), shape=shape + (len(index.values),))
+                    for w in weights
+                ]
+        return cls(
+            names,
+            {dim: m[0] for dim, m in matrices.items()},
+            {dim: m[1] for dim, m in matrices.items()},
+            {dim: m[2] for dim, m in matrices.items()},
+            totals, skills.n_rows, reference_date,
+        )
+
+    def append(self, days_ago, salary, skills: SkillsIndex, bitmaps: BitmapIndex) -> 'TrendIndex':
+        # `skills` / `bitmaps` ya incluyen las filas nuevas (los ids viejos no cambian, las claves
+        # nuevas van al final); `days_ago` / `salary` son solo las nuevas
+        delta = TrendIndex.from_index(days_ago, salary, skills, bitmaps, start=self.n_rows,
+                                      shift=self.days_since_reference(), dimensions=tuple(self.names))
+
+        def grow(matrix, size):
+            matrix = matrix.tocoo()
+            return sparse.csr_matrix((matrix.data, (matrix.row, matrix.col)), shape=(MAX_DAYS + 1, size))
+
+        def add(old, new):
+            return {dim: (grow(old[dim], len(delta.names[dim])) + new[dim]).tocsr() for dim in old}
+
+        return TrendIndex(
+            delta.names,
+            add(self.counts, delta.counts),
+            add(self.salary_sums, delta.salary_sums),
+            add(self.salary_counts, delta.salary_counts),
+            tuple(old + new for old, new in zip(self.totals, delta.totals)),
+            delta.n_rows, self.reference_date,
+        )
+
+    def days_since_reference(self):
+        # "a day ago" en una fila ingerida hoy es un día antes de hoy, no de la fecha del scrape
+        if self.reference_date is None:
+            return 0
+        return max((datetime.date.today() - self.reference_date).days, 0)
+
+    @property
+    def nbytes(self):
+        matrices = [*self.counts.values(), *self.salary_sums.values(), *self.salary_counts.values()]
+        return (sum(m.data.nbytes + m.indices.nbytes + m.indptr.nbytes for m in matrices)
+                + sum(t.nbytes for t in self.totals))
+
+    # -------------------------
+    # Buckets
+    # -------------------------
+    def _width(self, granularity):
+        return GRANULARITIES[granularity]
+
+    def buckets(self, granularity):
+        # en orden cronológico; el bucket k (desde el más reciente) va de k*w a k*w + w - 1 días atrás,
+        # salvo el más viejo, que termina en max_day (igual que _bucketed)
+        width = self._width(granularity)
+        labels = []
+        for k in reversed(range(self.max_day // width + 1)):
+            oldest = min(k * width + width - 1, self.max_day)
+            label = {'days_ago': [oldest, k * width]}
+            if self.reference_date is not None:
+                label['from'] = (self.reference_date - datetime.timedelta(days=oldest)).isoformat()
+                label['to'] = (self.reference_date - datetime.timedelta(days=k * width)).isoformat()
+            labels.append(label)
+        return labels
+
+    def _bucketed(self, per_day, granularity):
+        # (días, ...) -> (buckets, ...) del más viejo al más reciente
+        width = self._width(granularity)
+        limit = min((self.max_day // width + 1) * width, MAX_DAYS + 1)
+        return np.add.reduceat(per_day[:limit], np.arange(0, limit, width), axis=0)[::-1]
+
+    def _window_sums(self, matrix, granularity, window, offset):
+        # suma por clave de los `window` buckets que empiezan `offset` buckets atrás
+        width = self._width(granularity)
+        lo, hi = min(offset * width, MAX_DAYS + 1), min((offset + window) * width, MAX_DAYS + 1)
+        if sparse.issparse(matrix):
+            return np.asarray(matrix[lo:hi].sum(axis=0)).ravel()
+        return matrix[lo:hi].sum()
+
+    def _top_ids(self, dim, n):
+        counts = np.asarray(self.counts[dim].sum(axis=0)).ravel()
+        order = np.argsort(-counts, kind='stable')[:n]
+        return order[counts[order] > 0]
+
+    # -------------------------
+    # Consultas
+    # -------------------------
+    def _series(self, dim, keys=(), granularity='week', window=4, n=10):
+        # demanda y salario promedio por bucket de las claves pedidas (o las `n` con más ofertas),
+        # con ventana móvil de `window` buckets y crecimiento contra la ventana anterior
+        ids = [self.ids[dim][key] for key in keys] if keys else self._top_ids(dim, n)
+
+        def rolling(values):
+            sums = np.cumsum(values, axis=0)
+            sums[window:] = sums[window:] - sums[:-window]
+            return sums
+
+        def columns(matrix):
+            return self._bucketed(matrix[:, ids].toarray(), granularity)
+
+        counts, sums, valid = columns(self.counts[dim]), columns(self.salary_sums[dim]), columns(self.salary_counts[dim])
+        postings = self._bucketed(self.totals[0], granularity)
+        roll_counts, roll_sums, roll_valid = rolling(counts), rolling(sums), rolling(valid)
+        roll_postings = rolling(postings)
+        previous = np.full_like(roll_counts, np.nan)
+        previous[window:] = roll_counts[:-window]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            share = counts / postings[:, None]
+            mean_salary = sums / valid
+            rolling_share = roll_counts / roll_postings[:, None]
+            rolling_salary = roll_sums / roll_valid
+            growth = np.where(previous > 0, roll_counts / previous - 1, np.nan)
+
+        return {
+            'by': dim,
+            'granularity': granularity,
+            'window': window,
+            'buckets': self.buckets(granularity),
+            'postings': postings.astype(np.int64).tolist(),
+            'series': [
+                {
+                    'key': self.names[dim][i],
+                    'count': counts[:, j].astype(np.int64).tolist(),
+                    'share': [_number(v) for v in share[:, j]],
+                    'mean_salary': [_number(v) for v in mean_salary[:, j]],
+                    'rolling_count': roll_counts[:, j].astype(np.int64).tolist(),
+                    'rolling_share': [_number(v) for v in rolling_share[:, j]],
+                    'rolling_mean_salary': [_number(v) for v in rolling_salary[:, j]],
+                    'growth': [_number(v) for v in growth[:, j]],
+                }
+                for j, i in enumerate(ids)
+            ],
+        }
+
+    def _movers(self, dim, granularity='week', window=4, n=10, min_count=5):
+        # claves que más ganan / pierden participación entre los últimos `window` buckets y los anteriores
+        recent = self._window_sums(self.counts[dim], granularity, window, 0)
+        previous = self._window_sums(self.counts[dim], granularity, window, window)
+        recent_total = self._window_sums(self.totals[0], granularity, window, 0)
+        previous_total = self._window_sums(self.totals[0], granularity, window, window)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            recent_share = recent / recent_total if recent_total else np.zeros_like(recent)
+            previous_share = previous / previous_total if previous_total else np.zeros_like(previous)
+            growth = np.where(previous_share > 0, recent_share / previous_share - 1, np.nan)
+        change = recent_share - previous_share
+        candidates = np.flatnonzero(recent + previous >= max(min_count, 1))
+
+        def items(order):
+            return [
+                {
+                    'key': self.names[dim][i],
+                    'recent': int(recent[i]),
+                    'previous': int(previous[i]),
+                    'recent_share': float(recent_share[i]),
+                    'previous_share': float(previous_share[i]),
+                    'change': float(change[i]),
+                    'growth': _number(growth[i]),
+                }
+                for i in order
+            ]
+
+        rising = candidates[change[candidates] > 0]
+        falling = candidates[change[candidates] < 0]
+        return {
+            'by': dim,
+            'granularity': granularity,
+            'window': window,
+            'recent_postings': int(recent_total),
+            'previous_postings': int(previous_total),
+            'rising': items(rising[np.argsort(-change[rising], kind='stable')][:n]),
+            'falling': items(falling[np.argsort(change[falling], kind='stable')][:n]),
+        }
+
+    def _velocity(self, dim='company', granularity='week', window=4, n=10, min_count=1):
+        # ofertas por bucket en la ventana reciente contra la anterior (ritmo de contratación)
+        recent = self._window_sums(self.counts[dim], granularity, window, 0) / window
+        previous = self._window_sums(self.counts[dim], granularity, window, window) / window
+        candidates = np.flatnonzero(recent * window >= max(min_count, 1))
+        order = candidates[np.lexsort((-(recent - previous)[candidates], -recent[candidates]))][:n]
+        return {
+            'by': dim,
+            'granularity': granularity,
+            'window': window,
+            'items': [
+                {
+                    'key': self.names[dim][i],
+                    'velocity': float(recent[i]),
+                    'previous_velocity': float(previous[i]),
+                    'acceleration': float(recent[i] - previous[i]),
+                }
+                for i in order
+            ],
+        }